@@ -3,14 +3,28 @@
 Debug script to identify problematic imports causing segmentation fault
 """
 
+import importlib.util
 import sys
 import traceback
+from pathlib import Path
 
-def test_import(module_name):
-    """Test importing a module and catch any errors"""
+# Make the context_persistence package resolvable without installing it
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+def test_import(module_name, execute=False):
+    """
+    Check that a module can be found, optionally importing it.
+
+    find_spec only resolves the module (importing parent packages of dotted
+    names), so heavy libraries are not loaded unless execute is True.
+    """
     try:
         print(f"Testing import: {module_name}")
-        __import__(module_name)
+        if execute:
+            __import__(module_name)
+        elif importlib.util.find_spec(module_name) is None:
+            print(f"❌ {module_name} - NOT FOUND")
+            return False
         print(f"✅ {module_name} - OK")
         return True
     except Exception as e:
@@ -19,7 +33,16 @@ def test_import(module_name):
         return False
 
 def main():
-    """Test imports one by one to identify the problematic one"""
+    """
+    Test imports one by one to identify the problematic one.
+
+    Modules named on the command line are actually imported, e.g.
+    `python debug_import.py sentence_transformers`; all others are only
+    located.
+    """
+    
+    for module in sys.argv[1:]:
+        test_import(module, execute=True)
     
     # Test basic imports first
     basic_modules = [
@@ -73,21 +96,14 @@ def main():
     
     # Test Phase 6 imports (might have heavy dependencies)
     phase6_modules = [
-        ".entity_extractor",
-        ".knowledge_graph", 
-        ".hybrid_search",
-        ".models_enhanced"
+        "entity_extractor",
+        "knowledge_graph",
+        "hybrid_search",
+        "models_enhanced"
     ]
     
     for module in phase6_modules:
-        try:
-            print(f"Testing import: {module}")
-            import importlib.util
-            spec = importlib.util.spec_from_file_location("test", f"/Users/ceverson/MCP_Advanced_Multi_Agent_Ecosystem/src/mcp-servers/context-persistence/src/context_persistence/{module.replace('.', '/')}.py")
-            print(f"✅ {module} spec found")
-        except Exception as e:
-            print(f"❌ {module} - ERROR: {e}")
-            traceback.print_exc()
+        test_import(f"context_persistence.{module}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,27 +8,152 @@ Uses spaCy NLP to extract entities from conversations:
 - Confidence scoring
 """
 
+import hashlib
 import os
+import re
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
-from uuid import uuid4
-import spacy
-from spacy.tokens import Doc
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Iterator, List, Dict, Any, Optional, Tuple
+
+from .models_enhanced import new_ids
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+# Code entity patterns, compiled once at import time. The file path
+# patterns are scanned separately: their matches overlap (src/app.pyc,
+# mysrc/a.c), and one alternation would only keep the leftmost of each.
+# A span already matched by an earlier pattern is not reported again.
+_FILE_PATTERNS = (
+    re.compile(r'[\w/.-]+\.(?:py|js|ts|tsx|jsx|go|rs|java|cpp|c|h|md|json|yaml|yml)'),
+    re.compile(r'src/[\w/.-]+'),
+    re.compile(r'tests?/[\w/.-]+'),
+)
+_FUNC_RE = re.compile(r'\b([a-z_][a-z0-9_]*)\s*\(')
+# Words followed by "(" in prose or imports that are not function calls
+_FUNC_STOPWORDS = frozenset({'with', 'from', 'import'})
+_CLASS_RE = re.compile(r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)+)\b')
+
+# Technical terms that mark a noun chunk as a concept, matched as
+# case-insensitive substrings in one pass over the chunk
+_TECH_TERMS = (
+    'api', 'database', 'server', 'client', 'model', 'schema',
+    'service', 'component', 'module', 'package', 'library',
+    'framework', 'architecture', 'pattern', 'algorithm'
+)
+_TECH_TERM_RE = re.compile('|'.join(_TECH_TERMS), re.IGNORECASE)
+
+
+def _assign_ids(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fill in the id of each entity from one batch of time-ordered ids"""
+    for entity, entity_id in zip(entities, new_ids(len(entities))):
+        entity["id"] = entity_id
+    return entities
+
+
+@lru_cache(maxsize=4)
+def _load_pipeline(name: str, exclude: Tuple[str, ...]) -> "Language":
+    """Load a spaCy pipeline once per process; extractors share it"""
+    import spacy
+    return spacy.load(name, exclude=list(exclude))
+
+
+# spaCy entity labels and the entity types they map to; others are skipped
+_LABEL_TYPES = {
+    "PERSON": "person",
+    "ORG": "organization",
+    "PRODUCT": "tool",
+    "GPE": "location",
+    "DATE": "temporal",
+    "TIME": "temporal",
+    "EVENT": "event",
+    "WORK_OF_ART": "project",
+    "LAW": "concept",
+    "LANGUAGE": "tool"
+}
+
+# spaCy labels whose entities get a confidence bonus
+_RELIABLE_LABELS = frozenset({"PERSON", "ORG", "GPE", "PRODUCT"})
+
+
+def _worker_count(n_process: int, n_texts: int, batch_size: int) -> int:
+    """
+    Processes worth starting for a pipe over n_texts.
+
+    Workers are handed whole batches, so more than one per batch would sit
+    idle after paying the start-up and model transfer cost. -1 means one
+    per CPU, as for spaCy.
+    """
+    if n_process == -1:
+        n_process = os.cpu_count() or 1
+    return max(1, min(n_process, -(-n_texts // batch_size)))
+
+
+def _text_key(text: str) -> bytes:
+    """Digest used to key the extraction cache"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _rebind(
+    entities: List[Dict[str, Any]],
+    conversation_id: str,
+    message_id: Optional[int],
+    event_time: datetime,
+    ingestion_time: datetime
+) -> List[Dict[str, Any]]:
+    """Copy entities extracted from the same text onto another message"""
+    return _assign_ids([
+        {
+            **entity,
+            "event_time": event_time,
+            "ingestion_time": ingestion_time,
+            "valid_from": event_time,
+            "conversation_id": conversation_id,
+            "message_id": message_id,
+            "meta_data": dict(entity["meta_data"])
+        }
+        for entity in entities
+    ])
 
 
 class EntityExtractor:
     """
     Extracts structured entities from conversational text using NLP.
+
+    Results are cached per message text, so re-running extraction over a
+    conversation only sends new or edited messages through spaCy.
     """
 
-    def __init__(self):
-        """Initialize spaCy model with error handling"""
+    def __init__(self, cache_size: int = 10000, concepts: bool = True):
+        """
+        Args:
+            cache_size: Distinct texts whose entities are kept (0 disables)
+            concepts: Extract noun-chunk concepts; without them the tagger
+                and parser are not loaded and only NER runs
+        """
+        self.cache_size = cache_size
+        self.concepts = concepts
+        self._cache: "OrderedDict[bytes, List[Dict[str, Any]]]" = OrderedDict()
+
+    @cached_property
+    def nlp(self) -> Optional["Language"]:
+        """spaCy pipeline, loaded on first use to keep server start-up fast"""
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            # Lemmas are never read. noun_chunks needs the parser plus the
+            # POS tags from the tagger and attribute ruler, so those are
+            # only dropped when concepts are not extracted
+            exclude = ["lemmatizer"]
+            if not self.concepts:
+                exclude += ["tagger", "attribute_ruler", "parser"]
+            return _load_pipeline("en_core_web_sm", tuple(exclude))
         except OSError:
             # Fallback if model not available
             print("⚠️  spaCy model 'en_core_web_sm' not found. Run: python3 -m spacy download en_core_web_sm")
-            self.nlp = None
+        except Exception as load_error:
+            print(f"⚠️  spaCy unavailable, entity extraction disabled: {load_error}")
+        return None
 
     def extract_entities(
         self,
@@ -49,13 +174,101 @@ class EntityExtractor:
         Returns:
             List of entity dictionaries with metadata
         """
-        if not self.nlp:
+        return self.extract_entities_batch(
+            [(text, conversation_id, message_id)], event_time=event_time
+        )
+
+    def extract_entities_batch(
+        self,
+        items: List[Tuple[str, str, Optional[int]]],
+        event_time: Optional[datetime] = None,
+        batch_size: int = 32,
+        n_process: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract entities from many texts with a single spaCy pipe.
+
+        Args:
+            items: (text, conversation_id, message_id) tuples
+            event_time: When the events occurred (defaults to now)
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Worker processes for spaCy (-1 for all CPUs)
+
+        Returns:
+            List of entity dictionaries with metadata, in input order
+        """
+        if not self.nlp or not items:
             return []
 
+        ingestion_time = datetime.utcnow()
         if event_time is None:
-            event_time = datetime.utcnow()
+            event_time = ingestion_time
+
+        # Only texts not seen before go through spaCy, each of them once
+        per_item: List[Optional[List[Dict[str, Any]]]] = [None] * len(items)
+        misses: Dict[bytes, List[int]] = {}
+        for idx, (text, conversation_id, message_id) in enumerate(items):
+            key = _text_key(text)
+            cached = self._cache_get(key)
+            if cached is None:
+                misses.setdefault(key, []).append(idx)
+            else:
+                per_item[idx] = _rebind(
+                    cached, conversation_id, message_id, event_time, ingestion_time
+                )
+
+        texts = [items[positions[0]][0] for positions in misses.values()]
+        if len(texts) == 1:
+            # A lone text gains nothing from pipe's batching or worker processes
+            docs = [self.nlp(texts[0])]
+        else:
+            docs = self.nlp.pipe(
+                texts,
+                batch_size=batch_size,
+                n_process=_worker_count(n_process, len(texts), batch_size)
+            )
+
+        for doc, (key, positions) in zip(docs, misses.items()):
+            _, conversation_id, message_id = items[positions[0]]
+            extracted = self._entities_from_doc(
+                doc, conversation_id, message_id, event_time, ingestion_time
+            )
+            self._cache_put(key, extracted)
+            per_item[positions[0]] = extracted
+            for idx in positions[1:]:
+                _, conversation_id, message_id = items[idx]
+                per_item[idx] = _rebind(
+                    extracted, conversation_id, message_id, event_time, ingestion_time
+                )
+
+        return [entity for entities in per_item for entity in entities]
+
+    def _cache_get(self, key: bytes) -> Optional[List[Dict[str, Any]]]:
+        """Entities previously extracted from the text with this key"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        return cached
+
+    def _cache_put(self, key: bytes, entities: List[Dict[str, Any]]) -> None:
+        """Remember a private copy of entities extracted from a text"""
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = [
+            {**entity, "meta_data": dict(entity["meta_data"])} for entity in entities
+        ]
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
-        doc = self.nlp(text)
+    def _entities_from_doc(
+        self,
+        doc: "Doc",
+        conversation_id: str,
+        message_id: Optional[int],
+        event_time: datetime,
+        ingestion_time: datetime
+    ) -> List[Dict[str, Any]]:
+        """Collect named, code and concept entities from a processed doc"""
         entities = []
 
         # Extract standard named entities
@@ -63,12 +276,12 @@ class EntityExtractor:
             entity_type = self._map_entity_type(ent.label_)
             if entity_type:
                 entities.append({
-                    "id": str(uuid4()),
+                    "id": None,
                     "name": ent.text,
                     "entity_type": entity_type,
                     "description": f"{ent.label_}: {ent.text}",
                     "event_time": event_time,
-                    "ingestion_time": datetime.utcnow(),
+                    "ingestion_time": ingestion_time,
                     "valid_from": event_time,
                     "valid_until": None,
                     "conversation_id": conversation_id,
@@ -80,32 +293,26 @@ class EntityExtractor:
                         "end": ent.end_char
                     }
                 })
+        _assign_ids(entities)
 
         # Extract code-related entities
-        code_entities = self._extract_code_entities(doc, conversation_id, message_id, event_time)
+        code_entities = self._extract_code_entities(
+            doc, conversation_id, message_id, event_time, ingestion_time
+        )
         entities.extend(code_entities)
 
         # Extract technical concepts
-        concept_entities = self._extract_concepts(doc, conversation_id, message_id, event_time)
-        entities.extend(concept_entities)
+        if self.concepts:
+            concept_entities = self._extract_concepts(
+                doc, conversation_id, message_id, event_time, ingestion_time
+            )
+            entities.extend(concept_entities)
 
         return entities
 
     def _map_entity_type(self, spacy_label: str) -> Optional[str]:
         """Map spaCy entity labels to our entity types"""
-        mapping = {
-            "PERSON": "person",
-            "ORG": "organization",
-            "PRODUCT": "tool",
-            "GPE": "location",
-            "DATE": "temporal",
-            "TIME": "temporal",
-            "EVENT": "event",
-            "WORK_OF_ART": "project",
-            "LAW": "concept",
-            "LANGUAGE": "tool"
-        }
-        return mapping.get(spacy_label)
+        return _LABEL_TYPES.get(spacy_label)
 
     def _calculate_confidence(self, ent) -> float:
         """
@@ -115,26 +322,24 @@ class EntityExtractor:
         - Entity type (some types more reliable)
         - Presence in knowledge bases
         """
-        base_confidence = 0.7
-
-        # Longer entities tend to be more specific
-        if len(ent.text) > 10:
-            base_confidence += 0.1
-
-        # Certain entity types are more reliable
-        reliable_types = {"PERSON", "ORG", "GPE", "PRODUCT"}
-        if ent.label_ in reliable_types:
-            base_confidence += 0.1
+        # Base 0.7; longer entities tend to be more specific, and certain
+        # entity types are more reliable. Booleans count as 0 or 1.
+        confidence = (
+            0.7
+            + 0.1 * (len(ent.text) > 10)
+            + 0.1 * (ent.label_ in _RELIABLE_LABELS)
+        )
 
         # Cap at 1.0
-        return min(base_confidence, 1.0)
+        return min(confidence, 1.0)
 
     def _extract_code_entities(
         self,
-        doc: Doc,
+        doc: "Doc",
         conversation_id: str,
         message_id: Optional[int],
-        event_time: datetime
+        event_time: datetime,
+        ingestion_time: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """
         Extract code-related entities using pattern matching.
@@ -144,26 +349,25 @@ class EntityExtractor:
         - Class names (e.g., ClassName)
         - Imports (e.g., import numpy)
         """
+        if ingestion_time is None:
+            ingestion_time = datetime.utcnow()
         entities = []
         text = doc.text
 
         # Pattern 1: File paths (simplified)
-        import re
-        file_patterns = [
-            r'[\w/.-]+\.(py|js|ts|tsx|jsx|go|rs|java|cpp|c|h|md|json|yaml|yml)',
-            r'src/[\w/.-]+',
-            r'tests?/[\w/.-]+'
-        ]
-
-        for pattern in file_patterns:
-            for match in re.finditer(pattern, text):
+        file_spans = set()
+        for pattern in _FILE_PATTERNS:
+            for match in pattern.finditer(text):
+                if match.span() in file_spans:
+                    continue
+                file_spans.add(match.span())
                 entities.append({
-                    "id": str(uuid4()),
+                    "id": None,
                     "name": match.group(),
                     "entity_type": "file",
                     "description": f"File: {match.group()}",
                     "event_time": event_time,
-                    "ingestion_time": datetime.utcnow(),
+                    "ingestion_time": ingestion_time,
                     "valid_from": event_time,
                     "valid_until": None,
                     "conversation_id": conversation_id,
@@ -177,18 +381,17 @@ class EntityExtractor:
                 })
 
         # Pattern 2: Function calls (word followed by parentheses)
-        function_pattern = r'\b([a-z_][a-z0-9_]*)\s*\('
-        for match in re.finditer(function_pattern, text):
+        for match in _FUNC_RE.finditer(text):
             func_name = match.group(1)
             # Filter out common words
-            if len(func_name) > 3 and func_name not in {'with', 'from', 'import'}:
+            if len(func_name) > 3 and func_name not in _FUNC_STOPWORDS:
                 entities.append({
-                    "id": str(uuid4()),
+                    "id": None,
                     "name": func_name,
                     "entity_type": "function",
                     "description": f"Function: {func_name}",
                     "event_time": event_time,
-                    "ingestion_time": datetime.utcnow(),
+                    "ingestion_time": ingestion_time,
                     "valid_from": event_time,
                     "valid_until": None,
                     "conversation_id": conversation_id,
@@ -202,15 +405,14 @@ class EntityExtractor:
                 })
 
         # Pattern 3: Class names (PascalCase)
-        class_pattern = r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)+)\b'
-        for match in re.finditer(class_pattern, text):
+        for match in _CLASS_RE.finditer(text):
             entities.append({
-                "id": str(uuid4()),
+                "id": None,
                 "name": match.group(),
                 "entity_type": "class",
                 "description": f"Class: {match.group()}",
                 "event_time": event_time,
-                "ingestion_time": datetime.utcnow(),
+                "ingestion_time": ingestion_time,
                 "valid_from": event_time,
                 "valid_until": None,
                 "conversation_id": conversation_id,
@@ -223,18 +425,21 @@ class EntityExtractor:
                 }
             })
 
-        return entities
+        return _assign_ids(entities)
 
     def _extract_concepts(
         self,
-        doc: Doc,
+        doc: "Doc",
         conversation_id: str,
         message_id: Optional[int],
-        event_time: datetime
+        event_time: datetime,
+        ingestion_time: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """
         Extract technical concepts using noun chunks and patterns.
         """
+        if ingestion_time is None:
+            ingestion_time = datetime.utcnow()
         entities = []
 
         # Extract noun chunks as potential concepts
@@ -242,18 +447,14 @@ class EntityExtractor:
             # Filter for technical-sounding terms
             if len(chunk.text.split()) <= 3 and len(chunk.text) > 3:
                 # Check if it contains technical terms
-                tech_terms = {'api', 'database', 'server', 'client', 'model', 'schema',
-                             'service', 'component', 'module', 'package', 'library',
-                             'framework', 'architecture', 'pattern', 'algorithm'}
-
-                if any(term in chunk.text.lower() for term in tech_terms):
+                if _TECH_TERM_RE.search(chunk.text):
                     entities.append({
-                        "id": str(uuid4()),
+                        "id": None,
                         "name": chunk.text,
                         "entity_type": "concept",
                         "description": f"Technical concept: {chunk.text}",
                         "event_time": event_time,
-                        "ingestion_time": datetime.utcnow(),
+                        "ingestion_time": ingestion_time,
                         "valid_from": event_time,
                         "valid_until": None,
                         "conversation_id": conversation_id,
@@ -266,7 +467,7 @@ class EntityExtractor:
                         }
                     })
 
-        return entities
+        return _assign_ids(entities)
 
     def extract_entity_mentions(
         self,
@@ -289,46 +490,115 @@ class EntityExtractor:
         Returns:
             List of mention dictionaries
         """
-        mentions = []
-        name_lower = entity_name.lower()
+        if not entity_name:
+            return []
+
+        timestamp = datetime.utcnow()
         text_lower = text.lower()
+        name_lower = entity_name.lower()
+        if len(text_lower) != len(text) or len(name_lower) != len(entity_name):
+            # Lowercasing changed some lengths (e.g. "İ"), so offsets in the
+            # lowered text no longer line up; let the regex engine fold case
+            pattern = re.compile(re.escape(entity_name), re.IGNORECASE)
+            spans = (match.span() for match in pattern.finditer(text))
+        else:
+            spans = self._find_spans(text_lower, name_lower)
+
+        return [
+            self._build_mention(text, start, end, conversation_id, message_id, context_window, timestamp)
+            for start, end in spans
+        ]
 
-        # Find all occurrences
-        pos = 0
-        while True:
-            pos = text_lower.find(name_lower, pos)
-            if pos == -1:
-                break
+    @staticmethod
+    def _find_spans(text: str, name: str) -> Iterator[Tuple[int, int]]:
+        """Non-overlapping (start, end) spans of name in text, left to right"""
+        start = text.find(name)
+        while start >= 0:
+            end = start + len(name)
+            yield start, end
+            start = text.find(name, end)
 
-            # Extract context snippet
-            start = max(0, pos - context_window)
-            end = min(len(text), pos + len(entity_name) + context_window)
-            context = text[start:end]
+    def extract_all_mentions(
+        self,
+        text: str,
+        entity_names: List[str],
+        conversation_id: str,
+        message_id: int,
+        context_window: int = 50
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find mentions of several entities in a single scan of the text.
 
-            mentions.append({
-                "entity_id": None,  # Will be set by caller
-                "conversation_id": conversation_id,
-                "message_id": message_id,
-                "mention_text": text[pos:pos + len(entity_name)],
-                "context_snippet": context,
-                "position": pos,
-                "timestamp": datetime.utcnow(),
-                "confidence": 1.0  # Exact match
-            })
+        Longer names take precedence where names overlap, so "API server"
+        is reported instead of "API" at the same position.
 
-            pos += len(entity_name)
+        Args:
+            text: Text to search
+            entity_names: Entities to find
+            conversation_id: Conversation ID
+            message_id: Message ID
+            context_window: Characters to include in context snippet
+
+        Returns:
+            Dictionary mapping each entity name to its mention dictionaries
+        """
+        mentions: Dict[str, List[Dict[str, Any]]] = {name: [] for name in entity_names}
+        names = sorted((name for name in mentions if name), key=len, reverse=True)
+        if not names:
+            return mentions
+
+        # One capturing group per name; lastindex identifies which one matched
+        pattern = re.compile(
+            "|".join(f"({re.escape(name)})" for name in names),
+            re.IGNORECASE
+        )
+        timestamp = datetime.utcnow()
+        for match in pattern.finditer(text):
+            name = names[match.lastindex - 1]
+            mentions[name].append(
+                self._build_mention(
+                    text, match.start(), match.end(),
+                    conversation_id, message_id, context_window, timestamp
+                )
+            )
 
         return mentions
 
+    def _build_mention(
+        self,
+        text: str,
+        match_start: int,
+        match_end: int,
+        conversation_id: str,
+        message_id: int,
+        context_window: int,
+        timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Build a mention dictionary for a match, with surrounding context"""
+        start = max(0, match_start - context_window)
+        end = min(len(text), match_end + context_window)
+
+        return {
+            "entity_id": None,  # Will be set by caller
+            "conversation_id": conversation_id,
+            "message_id": message_id,
+            "mention_text": text[match_start:match_end],
+            "context_snippet": text[start:end],
+            "position": match_start,
+            "timestamp": timestamp,
+            "confidence": 1.0  # Exact match
+        }
+
     def deduplicate_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Remove duplicate entities based on name and type.
         Keeps the one with highest confidence.
         """
-        seen = {}
+        seen: Dict[Tuple[str, str], Dict[str, Any]] = {}
         for entity in entities:
-            key = (entity["name"].lower(), entity["entity_type"])
-            if key not in seen or entity["confidence"] > seen[key]["confidence"]:
+            key = (entity["name"].casefold(), entity["entity_type"])
+            current = seen.get(key)
+            if current is None or entity["confidence"] > current["confidence"]:
                 seen[key] = entity
 
         return list(seen.values())
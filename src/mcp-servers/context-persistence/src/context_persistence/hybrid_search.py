@@ -3,18 +3,27 @@ Hybrid Search for Phase 6 - Context Persistence
 
 Combines three search strategies:
 1. Semantic search (Qdrant vector similarity)
-2. Keyword search (SQLite FTS - Full Text Search)
+2. Keyword search (SQLite FTS5 with BM25 ranking)
 3. Graph search (entity relationships via NetworkX)
 
 Results are ranked and fused for optimal relevance.
 """
 
+import asyncio
+import heapq
+import re
+from collections import OrderedDict, defaultdict
+from contextlib import AbstractContextManager, nullcontext
+from functools import lru_cache
+from operator import attrgetter
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 from dataclasses import dataclass
+import numpy as np
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 from qdrant_client import QdrantClient
+from qdrant_client.models import SearchParams
 from .models_enhanced import Entity, Relationship, SearchIndex, Message
 from .knowledge_graph import KnowledgeGraph
 
@@ -30,6 +39,61 @@ class SearchResult:
     metadata: Dict[str, Any]
 
 
+# FTS5 query syntax words; in free text they are noise, not search terms
+_FTS_OPERATORS = frozenset({"AND", "OR", "NOT", "NEAR"})
+_WORD_RE = re.compile(r"\w")
+
+
+def _fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Each whitespace-separated term is quoted so punctuation in user input is
+    matched literally, and the terms are AND-ed: like the substring match
+    this replaced, a hit must contain every word. Operator words and
+    punctuation-only terms are dropped.
+    """
+    terms = [
+        '"' + term.replace('"', '""') + '"'
+        for term in query.split()
+        if term.upper() not in _FTS_OPERATORS and _WORD_RE.search(term)
+    ]
+    return " ".join(terms)
+
+
+def _normalize_bm25(ranks) -> List[float]:
+    """
+    Map FTS5 bm25() values (lower is better) onto 0-1 as r / (1 + r), r = -bm25.
+
+    The scale is absolute, so a weak best hit still scores low and
+    min_score means the same thing for every query.
+    """
+    return [r / (1.0 + r) for r in (max(-rank, 0.0) for rank in ranks)]
+
+
+# Storage types for the in-memory vector matrix
+_VECTOR_DTYPES = ("float32", "float16", "int8")
+# Rows upcast to float32 per block when scoring reduced-precision vectors
+_UPCAST_ROWS = 4096
+
+# In-memory copy of the messages collection: point ids, payloads, unit-length
+# rows and (int8 only) per-row dequantization factors
+_VectorSnapshot = Tuple[List[str], List[Dict[str, Any]], np.ndarray, Optional[np.ndarray]]
+
+
+@lru_cache(maxsize=32)
+def _rrf_weights(max_rank: int, k: int = 60) -> np.ndarray:
+    """Reciprocal Rank Fusion weights 1/(k+rank) for ranks 1..max_rank"""
+    weights = 1.0 / (k + np.arange(1, max_rank + 1, dtype=np.float64))
+    weights.flags.writeable = False
+    return weights
+
+
+async def _no_results() -> List["SearchResult"]:
+    """Placeholder for a search strategy the mode skips"""
+    return []
+
+
 class HybridSearch:
     """
     Combines semantic, keyword, and graph-based search.
@@ -39,7 +103,15 @@ class HybridSearch:
         self,
         qdrant_client: QdrantClient,
         embedding_model,
-        knowledge_graph: KnowledgeGraph
+        knowledge_graph: KnowledgeGraph,
+        search_params: Optional[SearchParams] = None,
+        query_cache_size: int = 4096,
+        max_batch: int = 32,
+        batch_wait: float = 0.005,
+        memory_search_limit: int = 0,
+        memory_search_dtype: str = "float32",
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        qdrant_lock: Optional[AbstractContextManager] = None
     ):
         """
         Initialize hybrid search with required components.
@@ -48,10 +120,49 @@ class HybridSearch:
             qdrant_client: Qdrant client for semantic search
             embedding_model: Model for generating embeddings
             knowledge_graph: Knowledge graph for relationship search
+            search_params: Optional Qdrant search parameters (hnsw_ef, rescoring)
+            query_cache_size: Number of query embeddings kept in the LRU cache
+            max_batch: Most queries encoded together in one model call
+            batch_wait: Seconds to wait for concurrent queries to join a batch
+            memory_search_limit: Largest collection to search in process memory
+                instead of querying Qdrant (0 disables)
+            memory_search_dtype: Storage for the in-memory vectors: "float32",
+                "float16" (half the memory) or "int8" (a quarter, with a
+                per-vector scale)
+            session_factory: Optional session maker; when set, keyword and
+                graph searches each open their own session and run in parallel
+            qdrant_lock: Held around every call into qdrant_client; pass a
+                lock when the client is embedded (path mode), which is not
+                thread-safe
         """
+        if memory_search_dtype not in _VECTOR_DTYPES:
+            raise ValueError(f"Unsupported memory_search_dtype: {memory_search_dtype}")
+
         self.qdrant = qdrant_client
         self.embedding_model = embedding_model
         self.kg = knowledge_graph
+        self.search_params = search_params
+        self.query_cache_size = query_cache_size
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.session_factory = session_factory
+        self.qdrant_lock = qdrant_lock if qdrant_lock is not None else nullcontext()
+
+        # Query text -> embedding; popular queries skip the model entirely
+        self._query_embeddings: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        # Queries waiting for the next batched encode call
+        self._pending_queries: List[Tuple[str, asyncio.Future]] = []
+        self._flush_tasks: set = set()
+
+        # In-memory copy of the messages collection for small corpora, replaced
+        # whole so readers never see half a load. invalidate_vectors() bumps the
+        # generation; a load only publishes if no invalidation raced it.
+        self.memory_search_limit = memory_search_limit
+        self.memory_search_dtype = memory_search_dtype
+        self._vectors: Optional[_VectorSnapshot] = None
+        self._vec_generation = 0
+        self._vec_loaded_generation = -1
+        self._vec_load_lock = asyncio.Lock()
 
     async def search(
         self,
@@ -77,26 +188,39 @@ class HybridSearch:
             List of ranked search results
         """
         filters = filters or {}
-        results = []
 
         # Execute search strategies based on mode
-        if mode in ("hybrid", "semantic"):
-            semantic_results = await self._semantic_search(
-                query, filters, limit, min_score
-            )
-            results.extend(semantic_results)
-
+        session_searches = {}
         if mode in ("hybrid", "keyword"):
-            keyword_results = await self._keyword_search(
-                session, query, filters, limit
-            )
-            results.extend(keyword_results)
-
+            session_searches["keyword"] = lambda s: self._keyword_search(s, query, filters, limit)
         if mode in ("hybrid", "graph"):
-            graph_results = await self._graph_search(
-                session, query, filters, limit
-            )
-            results.extend(graph_results)
+            session_searches["graph"] = lambda s: self._graph_search(s, query, filters, limit)
+
+        # Vector search never touches the session, so it overlaps the SQL work
+        if mode in ("hybrid", "semantic"):
+            semantic_search = self._semantic_search(query, filters, limit, min_score)
+        else:
+            semantic_search = _no_results()
+        semantic_results, session_results = await asyncio.gather(
+            semantic_search,
+            self._run_session_searches(session, list(session_searches.values())),
+            return_exceptions=True
+        )
+        if isinstance(session_results, Exception):
+            session_results = [session_results] * len(session_searches)
+
+        # A failed strategy is reported and left out; the others still count
+        results = []
+        outcomes = [("semantic", semantic_results), *zip(session_searches, session_results)]
+        for name, outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                print(f"⚠️  {name.capitalize()} search failed: {outcome}")
+                continue
+            if name == "semantic":
+                await self._load_message_content(session, outcome)
+            results.extend(outcome)
 
         # Rank and fuse results
         if mode == "hybrid":
@@ -119,6 +243,38 @@ class HybridSearch:
             if r.score >= min_score
         ]
 
+    async def _run_session_searches(
+        self,
+        session: AsyncSession,
+        searches: List[Callable[[AsyncSession], Awaitable[List[SearchResult]]]]
+    ) -> List[Any]:
+        """
+        Run searches that need a database session.
+
+        An AsyncSession cannot run statements concurrently, so searches share
+        the caller's session one after another unless a session factory is
+        configured, in which case each gets its own session in parallel.
+
+        Returns:
+            Each search's results, or the exception it raised
+        """
+        if self.session_factory is None or len(searches) < 2:
+            outcomes = []
+            for search in searches:
+                try:
+                    outcomes.append(await search(session))
+                except Exception as e:
+                    outcomes.append(e)
+            return outcomes
+
+        async def run(search):
+            async with self.session_factory() as own_session:
+                return await search(own_session)
+
+        return list(await asyncio.gather(
+            *(run(search) for search in searches), return_exceptions=True
+        ))
+
     async def _semantic_search(
         self,
         query: str,
@@ -130,11 +286,7 @@ class HybridSearch:
         Semantic search using Qdrant vector similarity.
         """
         # Generate query embedding
-        query_embedding = self.embedding_model.encode(query)
-        if hasattr(query_embedding, 'tolist'):
-            query_embedding = query_embedding.tolist()
-        else:
-            query_embedding = list(query_embedding)
+        query_embedding = await self._embed_query(query)
 
         # Build Qdrant filter
         qdrant_filter = None
@@ -143,40 +295,279 @@ class HybridSearch:
             # For now, we'll filter results after retrieval
             pass
 
-        # Search in Qdrant
+        # Search in memory when the collection fits, otherwise in Qdrant
         try:
-            search_results = self.qdrant.search(
-                collection_name="messages",
-                query_vector=query_embedding,
-                limit=limit * 2,  # Get more for filtering
-                score_threshold=min_score
-            )
+            vectors = await self._current_vectors() if self.memory_search_limit else None
+
+            if vectors is not None:
+                search_results = await asyncio.to_thread(
+                    self._memory_search, vectors, query_embedding, limit * 2, min_score
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self._query_points,
+                    query_embedding,
+                    limit * 2,  # Get more for filtering
+                    min_score
+                )
+                search_results = [
+                    (point.id, point.score, point.payload) for point in response.points
+                ]
         except Exception as e:
             print(f"⚠️  Semantic search failed: {e}")
             return []
 
-        # Convert to SearchResult objects
+        # Convert to SearchResult objects, filtering before allocating
+        conversation_id = filters.get("conversation_id")
         results = []
-        for result in search_results:
+        for point_id, score, payload in search_results:
+            if len(results) >= limit:
+                break
+
             # Apply filters
-            if filters.get("conversation_id"):
-                if result.payload.get("conversation_id") != filters["conversation_id"]:
-                    continue
+            if conversation_id and payload.get("conversation_id") != conversation_id:
+                continue
+            if score < min_score:
+                continue
 
             results.append(SearchResult(
-                item_id=result.id,
+                item_id=point_id,
                 item_type="message",
-                content=result.payload.get("content", ""),
-                score=result.score,
+                content=payload.get("content", ""),
+                score=score,
                 source="semantic",
                 metadata={
-                    "conversation_id": result.payload.get("conversation_id"),
-                    "role": result.payload.get("role"),
-                    "timestamp": result.payload.get("timestamp")
+                    "conversation_id": payload.get("conversation_id"),
+                    "role": payload.get("role"),
+                    "timestamp": payload.get("timestamp")
                 }
             ))
 
-        return results[:limit]
+        return results
+
+    def _query_points(self, query_embedding: List[float], limit: int, min_score: float):
+        """Nearest messages from Qdrant; runs on a worker thread"""
+        with self.qdrant_lock:
+            return self.qdrant.query_points(
+                collection_name="messages",
+                query=query_embedding,
+                limit=limit,
+                score_threshold=min_score,
+                with_payload=["conversation_id", "role", "timestamp", "content"],
+                search_params=self.search_params
+            )
+
+    def invalidate_vectors(self) -> None:
+        """Mark the in-memory vectors stale; call after writing to the collection"""
+        self._vec_generation += 1
+
+    async def _current_vectors(self) -> Optional[_VectorSnapshot]:
+        """
+        The in-memory vectors, reloaded first if the collection changed.
+
+        Loads are serialized; one that an invalidation overtakes is discarded
+        and this search goes to Qdrant instead.
+        """
+        async with self._vec_load_lock:
+            generation = self._vec_generation
+            if self._vec_loaded_generation == generation:
+                return self._vectors
+
+            vectors = await asyncio.to_thread(self._load_vectors)
+            if self._vec_generation != generation:
+                return None
+            self._vectors, self._vec_loaded_generation = vectors, generation
+            return vectors
+
+    def _load_vectors(self) -> Optional[_VectorSnapshot]:
+        """
+        Copy the messages collection into a contiguous matrix.
+
+        Rows are normalized in float32 and then stored as memory_search_dtype;
+        int8 rows are scaled so each one's largest component maps to 127.
+
+        Returns None (so searches go to Qdrant) when the collection holds
+        more than memory_search_limit points.
+        """
+        with self.qdrant_lock:
+            count = self.qdrant.count(collection_name="messages", exact=True).count
+            if count > self.memory_search_limit:
+                return None
+
+            ids, payloads, vectors = [], [], []
+            offset = None
+            while True:
+                records, offset = self.qdrant.scroll(
+                    collection_name="messages",
+                    limit=1024,
+                    offset=offset,
+                    with_payload=["conversation_id", "role", "timestamp", "content"],
+                    with_vectors=True
+                )
+                for record in records:
+                    ids.append(record.id)
+                    payloads.append(record.payload or {})
+                    vectors.append(record.vector)
+                if offset is None:
+                    break
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+
+        scales = None
+        if self.memory_search_dtype == "int8":
+            peaks = np.abs(matrix).max(axis=1) if len(matrix) else np.zeros(0, np.float32)
+            peaks = np.where(peaks == 0, 1.0, peaks).astype(np.float32)
+            matrix = np.rint(matrix * (127.0 / peaks)[:, None]).astype(np.int8)
+            scales = peaks / 127.0
+        elif self.memory_search_dtype == "float16":
+            matrix = matrix.astype(np.float16)
+
+        return ids, payloads, np.ascontiguousarray(matrix), scales
+
+    def _memory_search(
+        self,
+        vectors: _VectorSnapshot,
+        query_embedding: List[float],
+        top_k: int,
+        min_score: float
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Cosine top-k over an in-memory snapshot, highest score first"""
+        ids, payloads, matrix, scales = vectors
+        if not ids:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self._score_vectors(matrix, scales, query)
+
+        # argpartition selects the top k in O(N); only those k are sorted
+        if top_k < len(scores):
+            top = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (ids[idx], float(scores[idx]), payloads[idx])
+            for idx in top
+            if scores[idx] >= min_score
+        ]
+
+    @staticmethod
+    def _score_vectors(
+        matrix: np.ndarray,
+        scales: Optional[np.ndarray],
+        query: np.ndarray
+    ) -> np.ndarray:
+        """Dot product of a unit float32 query with every stored row"""
+        if matrix.dtype == np.float32:
+            return matrix @ query
+
+        # numpy has no BLAS kernels for float16/int8, so upcast a block of
+        # rows at a time; the full matrix never exists in float32
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), _UPCAST_ROWS):
+            block = matrix[start:start + _UPCAST_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        if scales is not None:
+            scores *= scales
+        return scores
+
+    async def _embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query, using the LRU cache when possible.
+
+        Cache misses from concurrent searches arriving within batch_wait of
+        each other are encoded together in a single model call.
+        """
+        cached = self._query_embeddings.get(query)
+        if cached is not None:
+            self._query_embeddings.move_to_end(query)
+            return list(cached)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_queries.append((query, future))
+        if len(self._pending_queries) >= self.max_batch:
+            task = asyncio.create_task(self._flush_queries())
+        elif len(self._pending_queries) == 1:
+            task = asyncio.create_task(self._flush_queries(delay=self.batch_wait))
+        else:
+            task = None
+        if task is not None:
+            # Hold a reference so the flush is not garbage collected mid-flight
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+        return list(await future)
+
+    async def _flush_queries(self, delay: float = 0.0) -> None:
+        """Encode all pending queries in one call and resolve their futures"""
+        if delay:
+            await asyncio.sleep(delay)
+
+        batch, self._pending_queries = self._pending_queries, []
+        if not batch:
+            return
+
+        queries = list(dict.fromkeys(query for query, _ in batch))
+        try:
+            vectors = await asyncio.to_thread(self._encode_queries, queries)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        embeddings = dict(zip(queries, vectors))
+        for query, vector in embeddings.items():
+            self._query_embeddings[query] = vector
+        while len(self._query_embeddings) > self.query_cache_size:
+            self._query_embeddings.popitem(last=False)
+
+        for query, future in batch:
+            if not future.done():
+                future.set_result(embeddings[query])
+
+    def _encode_queries(self, queries: List[str]) -> List[Tuple[float, ...]]:
+        """Run the embedding model over a batch of queries (blocking)"""
+        if len(queries) == 1:
+            encoded = [self.embedding_model.encode(queries[0], normalize_embeddings=True)]
+        else:
+            encoded = self.embedding_model.encode(
+                queries, batch_size=len(queries), normalize_embeddings=True
+            )
+
+        return [
+            tuple(vector.tolist() if hasattr(vector, 'tolist') else vector)
+            for vector in encoded
+        ]
+
+    async def _load_message_content(
+        self,
+        session: AsyncSession,
+        results: List[SearchResult]
+    ) -> None:
+        """
+        Fill in message content for semantic results from SQLite.
+
+        Qdrant payloads only carry conversation_id, role and timestamp;
+        the text is looked up by Qdrant point id (Message.embedding_id).
+        """
+        missing = {str(r.item_id): r for r in results if not r.content}
+        if not missing:
+            return
+
+        rows = await session.execute(
+            sa.select(Message.embedding_id, Message.content).where(
+                Message.embedding_id.in_(list(missing))
+            )
+        )
+        for embedding_id, content in rows.all():
+            missing[embedding_id].content = content or ""
 
     async def _keyword_search(
         self,
@@ -186,15 +577,32 @@ class HybridSearch:
         limit: int
     ) -> List[SearchResult]:
         """
-        Keyword search using SQLite LIKE queries.
+        Keyword search using the SQLite FTS5 indexes, ranked by BM25.
 
-        Note: For production, this should use FTS5 (Full-Text Search).
+        Scores map -bm25 onto 0-1 on a fixed scale (see _normalize_bm25).
         """
+        match = _fts_query(query)
+        if not match:
+            return []
+
         results = []
 
         # Search in messages
-        message_query = sa.select(Message).where(
-            Message.content.like(f"%{query}%")
+        messages_fts = sa.table("messages_fts", sa.column("rowid"))
+        rank = sa.func.bm25(sa.literal_column("messages_fts")).label("rank")
+        # Only the reported columns; no ORM objects are built for the hits
+        message_query = (
+            sa.select(
+                Message.id,
+                Message.content,
+                Message.conversation_id,
+                Message.role,
+                Message.timestamp,
+                Message.tokens,
+                rank
+            )
+            .join(messages_fts, messages_fts.c.rowid == Message.id)
+            .where(sa.text("messages_fts MATCH :match").bindparams(match=match))
         )
 
         # Apply filters
@@ -203,18 +611,12 @@ class HybridSearch:
                 Message.conversation_id == filters["conversation_id"]
             )
 
-        message_query = message_query.limit(limit)
+        message_query = message_query.order_by(rank).limit(limit)
 
         result = await session.execute(message_query)
-        messages = result.scalars().all()
-
-        for msg in messages:
-            # Calculate simple relevance score based on query term frequency
-            content_lower = msg.content.lower()
-            query_lower = query.lower()
-            score = content_lower.count(query_lower) / max(len(content_lower), 1)
-            score = min(score * 10, 1.0)  # Normalize to 0-1
+        rows = result.all()
 
+        for msg, score in zip(rows, _normalize_bm25(row.rank for row in rows)):
             results.append(SearchResult(
                 item_id=str(msg.id),
                 item_type="message",
@@ -229,12 +631,21 @@ class HybridSearch:
                 }
             ))
 
-        # Search in entities
-        entity_query = sa.select(Entity).where(
-            sa.or_(
-                Entity.name.like(f"%{query}%"),
-                Entity.description.like(f"%{query}%")
+        # Search in entities; name matches weigh three times description matches
+        entities_fts = sa.table("entities_fts", sa.column("rowid"))
+        rank = sa.func.bm25(sa.literal_column("entities_fts"), 3.0, 1.0).label("rank")
+        entity_query = (
+            sa.select(
+                Entity.id,
+                Entity.name,
+                Entity.description,
+                Entity.entity_type,
+                Entity.confidence,
+                Entity.conversation_id,
+                rank
             )
+            .join(entities_fts, entities_fts.c.rowid == sa.literal_column("entities.rowid"))
+            .where(sa.text("entities_fts MATCH :match").bindparams(match=match))
         )
 
         # Apply filters
@@ -243,18 +654,12 @@ class HybridSearch:
                 Entity.entity_type == filters["entity_type"]
             )
 
-        entity_query = entity_query.limit(limit)
+        entity_query = entity_query.order_by(rank).limit(limit)
 
         result = await session.execute(entity_query)
-        entities = result.scalars().all()
-
-        for entity in entities:
-            # Score based on name vs description match
-            if query.lower() in entity.name.lower():
-                score = 0.9
-            else:
-                score = 0.6
+        rows = result.all()
 
+        for entity, score in zip(rows, _normalize_bm25(row.rank for row in rows)):
             results.append(SearchResult(
                 item_id=entity.id,
                 item_type="entity",
@@ -293,7 +698,10 @@ class HybridSearch:
         result = await session.execute(entity_query)
         seed_entities = result.scalars().all()
 
-        # For each seed entity, find related entities in the graph
+        # For each seed entity, find related entities in the graph. The walk
+        # stays on the event loop: it is bounded (5 seeds, 2 hops) and the
+        # graph is rebuilt and patched on the loop, so a worker thread could
+        # see it mid-update.
         for seed_entity in seed_entities:
             if seed_entity.id not in self.kg.graph:
                 continue
@@ -335,36 +743,56 @@ class HybridSearch:
         RRF gives higher scores to items that rank well across multiple methods.
         """
         # Group results by source
-        by_source: Dict[str, List[SearchResult]] = {}
+        by_source: Dict[str, List[SearchResult]] = defaultdict(list)
         for result in results:
-            if result.source not in by_source:
-                by_source[result.source] = []
             by_source[result.source].append(result)
 
-        # Sort each source by score
-        for source in by_source:
-            by_source[source].sort(key=lambda x: x.score, reverse=True)
+        # Intern item keys to integer IDs; ranks past limit*4 add under
+        # 1/(k+4*limit) each, so only the head of every source is ranked
+        key_ids: Dict[Tuple[str, str], int] = {}
+        items: List[SearchResult] = []
+        ids: List[int] = []
+        source_sizes: List[int] = []
+
+        for source_results in by_source.values():
+            ranked = heapq.nlargest(limit * 4, source_results, key=attrgetter("score"))
+            source_sizes.append(len(ranked))
+            for result in ranked:
+                key = (result.item_type, result.item_id)
+                key_id = key_ids.setdefault(key, len(key_ids))
+                if key_id == len(items):
+                    items.append(result)
+                else:
+                    items[key_id] = result
+                ids.append(key_id)
+
+        if not items:
+            return []
 
-        # Calculate RRF scores
-        k = 60  # RRF constant
-        rrf_scores: Dict[str, float] = {}
-        item_map: Dict[str, SearchResult] = {}
+        # Each source contributes the head of the precomputed 1/(k+rank)
+        # table; accumulate per key in one vectorized pass
+        rank_weights = _rrf_weights(limit * 4)
+        rrf_scores = np.bincount(
+            np.asarray(ids, dtype=np.intp),
+            weights=np.concatenate([rank_weights[:size] for size in source_sizes]),
+            minlength=len(items)
+        )
 
-        for source, source_results in by_source.items():
-            for rank, result in enumerate(source_results, start=1):
-                key = f"{result.item_type}:{result.item_id}"
-                rrf_scores[key] = rrf_scores.get(key, 0) + 1.0 / (k + rank)
-                item_map[key] = result
+        if limit < len(items):
+            top = np.argpartition(-rrf_scores, limit)[:limit]
+        else:
+            top = np.arange(len(items))
+        top = top[np.argsort(-rrf_scores[top], kind="stable")]
 
         # Create fused results
         fused = []
-        for key, rrf_score in sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True):
-            result = item_map[key]
+        for key_id in top:
+            result = items[key_id]
             # Update score to RRF score
-            result.score = rrf_score
+            result.score = float(rrf_scores[key_id])
             fused.append(result)
 
-        return fused[:limit]
+        return fused
 
     async def search_by_entity(
         self,
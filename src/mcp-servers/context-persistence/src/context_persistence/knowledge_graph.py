@@ -9,13 +9,56 @@ Manages entity relationships using NetworkX:
 - Bi-temporal queries
 """
 
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, Set
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Set
 import networkx as nx
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy as sa
 from .models_enhanced import Entity, Relationship
 
+# Mermaid node delimiters by entity type
+_MERMAID_SHAPES = {
+    "person": ('(["', '"])'),
+    "file": ('[/"', '"\\]'),
+    "code": ('[/"', '"\\]'),
+    "concept": ("{", "}"),
+}
+_MERMAID_DEFAULT_SHAPE = ('["', '"]')
+
+# Node IDs, edge sources, edge targets, normalized weights, dangling mask
+_EdgeArrays = Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+# Write version, node count, edge count; see KnowledgeGraph._graph_key
+_GraphKey = Tuple[int, int, int]
+
+# Rows fetched per cursor batch when loading the graph
+_LOAD_BATCH_SIZE = 1000
+# How far before the last load an incremental refresh looks for changes
+_REFRESH_OVERLAP = timedelta(minutes=1)
+
+# Row counts and latest write times of both tables, in one round-trip
+_SOURCE_KEY_QUERY = sa.select(*(
+    sa.select(aggregate).scalar_subquery()
+    for model in (Entity, Relationship)
+    for aggregate in (
+        sa.func.count(model.id),
+        sa.func.max(model.ingestion_time),
+        sa.func.max(model.valid_until)
+    )
+))
+
+
+def _valid_at(model, as_of: datetime):
+    """Bi-temporal validity filter for entities or relationships at a time"""
+    return sa.and_(
+        model.valid_from <= as_of,
+        sa.or_(
+            model.valid_until.is_(None),
+            model.valid_until > as_of
+        )
+    )
+
 
 class KnowledgeGraph:
     """
@@ -27,6 +70,17 @@ class KnowledgeGraph:
         """Initialize an empty knowledge graph"""
         self.graph = nx.MultiDiGraph()  # Directed multigraph (multiple edges allowed)
         self._last_refresh = None
+        # Start time of the last load of current data; None when the graph
+        # was built for a past as_of and cannot be refreshed incrementally
+        self._watermark: Optional[datetime] = None
+        # Database fingerprint seen by the last load; see ensure_current
+        self._source_key: Optional[Tuple[Any, ...]] = None
+        # Bumped by every load and write made through this class; derived
+        # data is cached against it (see _graph_key)
+        self._version = 0
+        self._edge_arrays_cache: Optional[Tuple[_GraphKey, _EdgeArrays]] = None
+        self._stats_cache: Optional[Tuple[_GraphKey, Dict[str, Any]]] = None
+        self._rank_cache: Optional[Tuple[_GraphKey, Tuple[List[str], np.ndarray]]] = None
 
     async def build_graph(self, session: AsyncSession, as_of: Optional[datetime] = None) -> int:
         """
@@ -39,6 +93,7 @@ class KnowledgeGraph:
         Returns:
             Number of nodes added
         """
+        current = as_of is None
         if as_of is None:
             as_of = datetime.utcnow()
 
@@ -46,56 +101,207 @@ class KnowledgeGraph:
         self.graph.clear()
 
         # Get valid entities at this time
-        entities_query = sa.select(Entity).where(
-            Entity.valid_from <= as_of,
-            sa.or_(
-                Entity.valid_until.is_(None),
-                Entity.valid_until > as_of
-            )
-        )
-        result = await session.execute(entities_query)
-        entities = result.scalars().all()
-
-        # Add entities as nodes
-        for entity in entities:
-            self.graph.add_node(
-                entity.id,
-                name=entity.name,
-                entity_type=entity.entity_type,
-                description=entity.description,
-                confidence=entity.confidence,
-                meta_data=entity.meta_data,
-                conversation_id=entity.conversation_id,
-                message_id=entity.message_id
-            )
+        await self._load_entities(session, _valid_at(Entity, as_of))
 
         # Get valid relationships
-        rels_query = sa.select(Relationship).where(
-            Relationship.valid_from <= as_of,
-            sa.or_(
-                Relationship.valid_until.is_(None),
-                Relationship.valid_until > as_of
-            )
+        await self._load_relationships(session, _valid_at(Relationship, as_of))
+
+        self._watermark = as_of if current else None
+        self._last_refresh = datetime.utcnow()
+        self._version += 1
+        return self.graph.number_of_nodes()
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Apply changes made since the last load instead of rebuilding.
+
+        Rows ingested or becoming valid since the previous load are added or
+        updated in place; rows whose validity ended since then are removed.
+        Falls back to a full build_graph when there is no current load to
+        start from.
+
+        Args:
+            session: Database session
+
+        Returns:
+            Number of nodes in the graph
+        """
+        if self._watermark is None:
+            return await self.build_graph(session)
+
+        now = datetime.utcnow()
+        # Re-read a margin before the watermark so rows stamped before the
+        # last load but committed after it are not missed; re-adding is idempotent
+        since = self._watermark - _REFRESH_OVERLAP
+
+        for model, load in (
+            (Entity, self._load_entities),
+            (Relationship, self._load_relationships)
+        ):
+            await load(session, sa.and_(
+                _valid_at(model, now),
+                sa.or_(model.ingestion_time > since, model.valid_from > since)
+            ))
+
+        # Tombstones: relationships first, so their endpoints still exist
+        ended = await session.execute(
+            sa.select(
+                Relationship.id,
+                Relationship.source_entity_id,
+                Relationship.target_entity_id
+            ).where(Relationship.valid_until > since, Relationship.valid_until <= now)
         )
-        result = await session.execute(rels_query)
-        relationships = result.scalars().all()
-
-        # Add relationships as edges
-        for rel in relationships:
-            self.graph.add_edge(
-                rel.source_entity_id,
-                rel.target_entity_id,
-                key=rel.id,
-                relationship_type=rel.relationship_type,
-                confidence=rel.confidence,
-                properties=rel.properties,
-                conversation_id=rel.conversation_id,
-                message_id=rel.message_id
-            )
+        for rel_id, source_id, target_id in ended.all():
+            if self.graph.has_edge(source_id, target_id, key=rel_id):
+                self.graph.remove_edge(source_id, target_id, key=rel_id)
+
+        ended = await session.execute(
+            sa.select(Entity.id).where(Entity.valid_until > since, Entity.valid_until <= now)
+        )
+        self.graph.remove_nodes_from(ended.scalars().all())
 
+        self._watermark = now
         self._last_refresh = datetime.utcnow()
+        self._version += 1
         return self.graph.number_of_nodes()
 
+    async def ensure_current(self, session: AsyncSession) -> int:
+        """
+        Bring the graph up to date with the database, doing no work if
+        nothing has been written since the last load.
+
+        Row counts plus the latest ingestion_time and valid_until of both
+        tables fingerprint the data: inserts and invalidations change it,
+        so an unchanged fingerprint skips loading altogether. Changes are
+        applied with refresh, which only rebuilds when the graph does not
+        hold current data.
+
+        Args:
+            session: Database session
+
+        Returns:
+            Number of nodes in the graph
+        """
+        key = tuple((await session.execute(_SOURCE_KEY_QUERY)).one())
+        if self.is_current and key == self._source_key:
+            return self.graph.number_of_nodes()
+
+        node_count = await self.refresh(session)
+        self._source_key = key
+        return node_count
+
+    async def _load_entities(self, session: AsyncSession, criteria) -> None:
+        """Stream matching entities into the graph as nodes (plain rows, no ORM objects)"""
+        query = sa.select(
+            Entity.id,
+            Entity.name,
+            Entity.entity_type,
+            Entity.description,
+            Entity.confidence,
+            Entity.meta_data,
+            Entity.conversation_id,
+            Entity.message_id
+        ).where(criteria)
+        # Fetched from the cursor in batches rather than all at once
+        result = await session.stream(
+            query.execution_options(yield_per=_LOAD_BATCH_SIZE)
+        )
+
+        async for rows in result.partitions():
+            self.graph.add_nodes_from(
+                (
+                    row.id,
+                    {
+                        "name": row.name,
+                        "entity_type": row.entity_type,
+                        "description": row.description,
+                        "confidence": row.confidence,
+                        "meta_data": row.meta_data,
+                        "conversation_id": row.conversation_id,
+                        "message_id": row.message_id
+                    }
+                )
+                for row in rows
+            )
+
+    async def _load_relationships(self, session: AsyncSession, criteria) -> None:
+        """Stream matching relationships into the graph as keyed edges"""
+        query = sa.select(
+            Relationship.id,
+            Relationship.source_entity_id,
+            Relationship.target_entity_id,
+            Relationship.relationship_type,
+            Relationship.confidence,
+            Relationship.properties,
+            Relationship.conversation_id,
+            Relationship.message_id
+        ).where(criteria)
+        result = await session.stream(
+            query.execution_options(yield_per=_LOAD_BATCH_SIZE)
+        )
+
+        async for rows in result.partitions():
+            self.graph.add_edges_from(
+                (
+                    row.source_entity_id,
+                    row.target_entity_id,
+                    row.id,
+                    {
+                        "relationship_type": row.relationship_type,
+                        "confidence": row.confidence,
+                        "properties": row.properties,
+                        "conversation_id": row.conversation_id,
+                        "message_id": row.message_id
+                    }
+                )
+                for row in rows
+            )
+
+    @property
+    def is_current(self) -> bool:
+        """Whether the graph holds a load of current data that writes can patch"""
+        return self._watermark is not None
+
+    def add_entity_node(self, entity: Dict[str, Any]) -> None:
+        """
+        Add or update a just-written entity without a database round-trip.
+
+        Args:
+            entity: Entity column values as inserted; omitted columns take
+                their model defaults
+        """
+        self.graph.add_node(
+            entity["id"],
+            name=entity["name"],
+            entity_type=entity["entity_type"],
+            description=entity.get("description"),
+            confidence=entity.get("confidence", 1.0),
+            meta_data=entity.get("meta_data", {}),
+            conversation_id=entity.get("conversation_id"),
+            message_id=entity.get("message_id")
+        )
+        self._version += 1
+
+    def add_relationship_edge(self, relationship: Dict[str, Any]) -> None:
+        """
+        Add or update a just-written relationship without a database round-trip.
+
+        Args:
+            relationship: Relationship column values as inserted; omitted
+                columns take their model defaults
+        """
+        self.graph.add_edge(
+            relationship["source_entity_id"],
+            relationship["target_entity_id"],
+            key=relationship["id"],
+            relationship_type=relationship["relationship_type"],
+            confidence=relationship.get("confidence", 1.0),
+            properties=relationship.get("properties", {}),
+            conversation_id=relationship.get("conversation_id"),
+            message_id=relationship.get("message_id")
+        )
+        self._version += 1
+
     def find_paths(
         self,
         source_id: str,
@@ -118,18 +324,62 @@ class KnowledgeGraph:
         if source_id not in self.graph or target_id not in self.graph:
             return []
 
-        try:
-            paths = list(nx.all_simple_paths(
-                self.graph,
-                source_id,
-                target_id,
-                cutoff=max_depth
-            ))
-            if cutoff:
-                paths = paths[:cutoff]
-            return paths
-        except nx.NetworkXNoPath:
-            return []
+        paths = self._simple_paths(source_id, target_id, max_depth)
+        return list(islice(paths, cutoff) if cutoff else paths)
+
+    def _simple_paths(self, source_id: str, target_id: str, max_depth: int) -> Iterator[List[str]]:
+        """
+        Yield simple paths of at most max_depth edges, depth-first.
+
+        A reverse BFS from the target bounds each node's remaining hop count,
+        so branches that cannot reach the target in time are never expanded.
+        Parallel edges yield a path only once.
+
+        Args:
+            source_id: Source entity ID
+            target_id: Target entity ID
+            max_depth: Maximum path length
+
+        Yields:
+            Paths as lists of entity IDs
+        """
+        if source_id == target_id:
+            yield [source_id]
+            return
+
+        # Hop distance to the target for nodes that can still reach it
+        pred = self.graph.pred
+        to_target = {target_id: 0}
+        frontier = [target_id]
+        for distance in range(1, max_depth):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in pred[node]:
+                    if neighbor not in to_target:
+                        to_target[neighbor] = distance
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        succ = self.graph.succ
+        path = [source_id]
+        on_path = {source_id}
+        stack = [iter(succ[source_id])]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if child in on_path or len(path) > max_depth:
+                continue
+            if child == target_id:
+                yield path + [child]
+            elif to_target.get(child, max_depth) <= max_depth - len(path):
+                path.append(child)
+                on_path.add(child)
+                stack.append(iter(succ[child]))
 
     def find_shortest_path(self, source_id: str, target_id: str) -> Optional[List[str]]:
         """
@@ -146,7 +396,7 @@ class KnowledgeGraph:
             return None
 
         try:
-            return nx.shortest_path(self.graph, source_id, target_id)
+            return nx.bidirectional_shortest_path(self.graph, source_id, target_id)
         except nx.NetworkXNoPath:
             return None
 
@@ -171,6 +421,10 @@ class KnowledgeGraph:
             return {}
 
         neighbors_by_level = {}
+        succ = self.graph._succ
+        nodes = self.graph.nodes
+        # Membership is tested once per edge, so build the set once
+        wanted_types = set(relationship_types) if relationship_types else None
 
         # BFS to get neighbors at each level
         current_level = {entity_id}
@@ -179,28 +433,33 @@ class KnowledgeGraph:
         for level in range(1, depth + 1):
             next_level = set()
             for node in current_level:
-                for neighbor in self.graph.neighbors(node):
+                for neighbor, edges in succ[node].items():
                     if neighbor not in visited:
                         # Check relationship type filter
-                        if relationship_types:
-                            edges = self.graph.get_edge_data(node, neighbor)
-                            if not any(
-                                edge_data.get('relationship_type') in relationship_types
-                                for edge_data in edges.values()
-                            ):
-                                continue
+                        if wanted_types and not any(
+                            edge_data.get('relationship_type') in wanted_types
+                            for edge_data in edges.values()
+                        ):
+                            continue
 
                         next_level.add(neighbor)
                         visited.add(neighbor)
 
-            if next_level:
-                neighbors_by_level[f"depth_{level}"] = [
-                    {
-                        "id": nid,
-                        **self.graph.nodes[nid]
-                    }
-                    for nid in next_level
-                ]
+            if not next_level:
+                break
+
+            # Pick summary fields rather than copying every node attribute
+            level_neighbors = []
+            for nid in next_level:
+                node_data = nodes[nid]
+                level_neighbors.append({
+                    "id": nid,
+                    "name": node_data.get("name"),
+                    "entity_type": node_data.get("entity_type"),
+                    "description": node_data.get("description"),
+                    "confidence": node_data.get("confidence")
+                })
+            neighbors_by_level[f"depth_{level}"] = level_neighbors
 
             current_level = next_level
 
@@ -226,13 +485,20 @@ class KnowledgeGraph:
         # Get neighbors
         neighbors = self.get_neighbors(entity_id, depth)
 
+        # Read adjacency dicts directly; each neighbor's name is looked up
+        # once however many parallel edges connect it
+        nodes = self.graph._node
+        succ = self.graph._succ[entity_id]
+        pred = self.graph._pred[entity_id]
+
         # Get outgoing relationships
         out_edges = []
-        for target in self.graph.successors(entity_id):
-            for key, edge_data in self.graph.get_edge_data(entity_id, target).items():
+        for target, edges in succ.items():
+            target_name = nodes[target].get("name")
+            for edge_data in edges.values():
                 out_edges.append({
                     "target_id": target,
-                    "target_name": self.graph.nodes[target]["name"],
+                    "target_name": target_name,
                     "relationship_type": edge_data.get("relationship_type"),
                     "confidence": edge_data.get("confidence"),
                     "properties": edge_data.get("properties", {})
@@ -240,11 +506,12 @@ class KnowledgeGraph:
 
         # Get incoming relationships
         in_edges = []
-        for source in self.graph.predecessors(entity_id):
-            for key, edge_data in self.graph.get_edge_data(source, entity_id).items():
+        for source, edges in pred.items():
+            source_name = nodes[source].get("name")
+            for edge_data in edges.values():
                 in_edges.append({
                     "source_id": source,
-                    "source_name": self.graph.nodes[source]["name"],
+                    "source_name": source_name,
                     "relationship_type": edge_data.get("relationship_type"),
                     "confidence": edge_data.get("confidence"),
                     "properties": edge_data.get("properties", {})
@@ -256,9 +523,9 @@ class KnowledgeGraph:
             "outgoing_relationships": out_edges,
             "incoming_relationships": in_edges,
             "stats": {
-                "out_degree": self.graph.out_degree(entity_id),
-                "in_degree": self.graph.in_degree(entity_id),
-                "total_degree": self.graph.degree(entity_id)
+                "out_degree": len(out_edges),
+                "in_degree": len(in_edges),
+                "total_degree": len(out_edges) + len(in_edges)
             }
         }
 
@@ -282,15 +549,19 @@ class KnowledgeGraph:
         if entity_id not in self.graph:
             return []
 
-        # Use shortest path lengths
-        try:
-            distances = nx.single_source_shortest_path_length(
-                self.graph.to_undirected(),
-                entity_id,
-                cutoff=max_distance
-            )
-        except nx.NetworkXError:
-            return []
+        # Bounded BFS treating edges as undirected, without copying the graph
+        distances = {entity_id: 0}
+        frontier = [entity_id]
+        for distance in range(1, max_distance + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._undirected_neighbors(node):
+                    if neighbor not in distances:
+                        distances[neighbor] = distance
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
 
         related = []
         for target_id, distance in distances.items():
@@ -316,6 +587,18 @@ class KnowledgeGraph:
 
         return related
 
+    def _undirected_neighbors(self, node: str) -> Set[str]:
+        """
+        Get neighbors of a node regardless of edge direction.
+
+        Args:
+            node: Entity ID
+
+        Returns:
+            Set of successor and predecessor entity IDs
+        """
+        return self.graph._succ[node].keys() | self.graph._pred[node].keys()
+
     def get_connected_components(self) -> List[Set[str]]:
         """
         Get weakly connected components in the graph.
@@ -338,17 +621,107 @@ class KnowledgeGraph:
         if self.graph.number_of_nodes() == 0:
             return {}
 
-        # Use PageRank for centrality
-        scores = nx.pagerank(self.graph)
+        # PageRank is computed once per graph version, whatever the limit
+        key = self._graph_key()
+        if self._rank_cache is None or self._rank_cache[0] != key:
+            self._rank_cache = (key, self._pagerank())
+        nodes, scores = self._rank_cache[1]
 
-        # Sort and limit
-        sorted_scores = sorted(
-            scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
+        # Partial selection of the top entries, then order just those
+        if limit < len(nodes):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(nodes))
+        top = top[np.argsort(-scores[top], kind="stable")]
 
-        return dict(sorted_scores)
+        return {nodes[i]: float(scores[i]) for i in top}
+
+    def _pagerank(
+        self,
+        alpha: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1.0e-6
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Vectorized PageRank matching nx.pagerank defaults.
+
+        Parallel edges are summed by weight (default 1.0) and dangling nodes
+        redistribute their rank uniformly, as NetworkX does.
+
+        Args:
+            alpha: Damping factor
+            max_iter: Maximum power iterations
+            tol: Convergence tolerance (scaled by node count)
+
+        Returns:
+            Tuple of (node IDs, scores aligned with the node IDs)
+        """
+        nodes, src, dst, share, dangling = self._edge_arrays()
+        n = len(nodes)
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            prev = rank
+            rank = alpha * (
+                np.bincount(dst, weights=prev[src] * share, minlength=n)
+                + prev[dangling].sum() / n
+            ) + (1.0 - alpha) / n
+            if np.abs(rank - prev).sum() < n * tol:
+                break
+
+        return nodes, rank
+
+    def invalidate(self) -> None:
+        """
+        Drop cached derived data.
+
+        Needed only after editing self.graph directly in a way that leaves
+        its node and edge counts unchanged (see _graph_key).
+        """
+        self._version += 1
+
+    def _graph_key(self) -> _GraphKey:
+        """
+        Cache key for data derived from the graph.
+
+        Writes through this class bump the version. The node and edge counts
+        catch nodes or edges added to or removed from self.graph directly;
+        direct edits that keep both counts need invalidate().
+        """
+        return (self._version, self.graph.number_of_nodes(), self.graph.number_of_edges())
+
+    def _edge_arrays(self) -> _EdgeArrays:
+        """
+        The graph as parallel NumPy arrays, rebuilt only after it changes.
+
+        Returns:
+            Tuple of (node IDs, edge source indices, edge target indices,
+            row-normalized edge weights, dangling node mask)
+        """
+        key = self._graph_key()
+        if self._edge_arrays_cache is not None and self._edge_arrays_cache[0] == key:
+            return self._edge_arrays_cache[1]
+
+        nodes = list(self.graph)
+        n = len(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+
+        edges = [
+            (index[u], index[v], w)
+            for u, v, w in self.graph.edges(data="weight", default=1.0)
+        ]
+        src = np.fromiter((e[0] for e in edges), dtype=np.intp, count=len(edges))
+        dst = np.fromiter((e[1] for e in edges), dtype=np.intp, count=len(edges))
+        weight = np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges))
+
+        # Row-normalize so each node's out-edges sum to one
+        out_weight = np.bincount(src, weights=weight, minlength=n)
+        dangling = out_weight == 0
+        share = weight / out_weight[src] if len(edges) else weight
+
+        arrays = (nodes, src, dst, share, dangling)
+        self._edge_arrays_cache = (key, arrays)
+        return arrays
 
     def visualize_mermaid(
         self,
@@ -370,48 +743,57 @@ class KnowledgeGraph:
             subgraph = self.graph.subgraph(entity_ids)
         else:
             # Use full graph but limit size
-            nodes = list(self.graph.nodes())[:max_nodes]
-            subgraph = self.graph.subgraph(nodes)
-
-        lines = ["graph TD"]
-
-        # Add nodes
-        for node_id in subgraph.nodes():
-            node_data = subgraph.nodes[node_id]
-            name = node_data.get("name", node_id)
-            entity_type = node_data.get("entity_type", "unknown")
-
-            # Sanitize for Mermaid
-            safe_id = node_id.replace("-", "_")
-            safe_name = name.replace('"', "'")
-
-            # Different shapes for different entity types
-            if entity_type == "person":
-                lines.append(f'    {safe_id}(["{safe_name}"])')
-            elif entity_type in ("file", "code"):
-                lines.append(f'    {safe_id}[/"{safe_name}"\\]')
-            elif entity_type == "concept":
-                lines.append(f'    {safe_id}{"{" + safe_name + "}"}')
-            else:
-                lines.append(f'    {safe_id}["{safe_name}"]')
-
-        # Add edges
-        for source, target, data in subgraph.edges(data=True):
-            safe_source = source.replace("-", "_")
-            safe_target = target.replace("-", "_")
-            rel_type = data.get("relationship_type", "related")
+            subgraph = self.graph.subgraph(islice(self.graph, max_nodes))
+
+        return "\n".join(self._iter_mermaid_lines(subgraph))
+
+    @staticmethod
+    def _iter_mermaid_lines(subgraph: nx.MultiDiGraph) -> Iterator[str]:
+        """
+        Yield Mermaid diagram lines for a subgraph.
+
+        Args:
+            subgraph: Graph (or view) to render
 
-            lines.append(f'    {safe_source} -->|{rel_type}| {safe_target}')
+        Yields:
+            Header, node and edge lines
+        """
+        # Sanitize IDs for Mermaid once per node
+        safe_ids = {node_id: node_id.replace("-", "_") for node_id in subgraph.nodes()}
 
-        return "\n".join(lines)
+        yield "graph TD"
+
+        # Nodes, with different shapes for different entity types
+        for node_id, node_data in subgraph.nodes(data=True):
+            safe_name = node_data.get("name", node_id).replace('"', "'")
+            prefix, suffix = _MERMAID_SHAPES.get(
+                node_data.get("entity_type", "unknown"), _MERMAID_DEFAULT_SHAPE
+            )
+            yield f"    {safe_ids[node_id]}{prefix}{safe_name}{suffix}"
+
+        # Edges
+        for source, target, data in subgraph.edges(data=True):
+            yield f'    {safe_ids[source]} -->|{data.get("relationship_type", "related")}| {safe_ids[target]}'
 
     def get_graph_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the knowledge graph.
 
+        Computed once per graph version; each caller gets its own copy.
+
         Returns:
             Dictionary with graph statistics
         """
+        key = self._graph_key()
+        if self._stats_cache is None or self._stats_cache[0] != key:
+            self._stats_cache = (key, self._compute_graph_stats())
+        stats = dict(self._stats_cache[1])
+        if "entity_type_distribution" in stats:
+            stats["entity_type_distribution"] = dict(stats["entity_type_distribution"])
+        return stats
+
+    def _compute_graph_stats(self) -> Dict[str, Any]:
+        """Graph statistics for get_graph_stats, computed from scratch"""
         stats = {
             "num_nodes": self.graph.number_of_nodes(),
             "num_edges": self.graph.number_of_edges(),
@@ -421,7 +803,8 @@ class KnowledgeGraph:
 
         if stats["num_nodes"] > 0:
             stats["density"] = nx.density(self.graph)
-            stats["avg_degree"] = sum(dict(self.graph.degree()).values()) / stats["num_nodes"]
+            # Every edge adds one to the degree of each endpoint
+            stats["avg_degree"] = 2 * stats["num_edges"] / stats["num_nodes"]
 
             # Entity type distribution
             entity_types = {}
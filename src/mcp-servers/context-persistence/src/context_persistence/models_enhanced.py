@@ -6,14 +6,43 @@ Adds:
 - Knowledge graph (entities + relationships)
 """
 
-from datetime import datetime
+import os
+import time
+from datetime import datetime, timezone
 from typing import Optional
+from uuid import UUID
 import sqlalchemy as sa
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import declarative_base, relationship as sa_relationship
 
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the stored columns"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def new_ids(n: int) -> list[str]:
+    """
+    Generate n UUIDv7 strings from a single os.urandom call.
+
+    The ids lead with the millisecond timestamp and are returned in
+    ascending order, so rows written later land at the end of the id
+    indexes instead of splitting pages at random positions.
+    """
+    prefix = (time.time_ns() // 1_000_000).to_bytes(6, "big")
+    buf = os.urandom(10 * n)
+    ids = []
+    for i in range(n):
+        raw = bytearray(prefix + buf[i * 10:(i + 1) * 10])
+        raw[6] = 0x70 | (raw[6] & 0x0F)  # version 7
+        raw[8] = 0x80 | (raw[8] & 0x3F)  # RFC 4122 variant
+        ids.append(str(UUID(bytes=bytes(raw))))
+    ids.sort()
+    return ids
+
+
 # ============================================================================
 # Core Models - Moved from server.py to resolve circular imports
 # ============================================================================
@@ -22,7 +51,7 @@ class Conversation(Base):
     __tablename__ = "conversations"
     
     id = sa.Column(sa.String, primary_key=True)
-    started_at = sa.Column(sa.DateTime, default=datetime.utcnow)
+    started_at = sa.Column(sa.DateTime, default=utcnow)
     project_path = sa.Column(sa.String, nullable=True)
     mode = sa.Column(sa.String, nullable=True)
     meta_data = sa.Column(sa.JSON, default=dict)
@@ -33,11 +62,15 @@ class Message(Base):
     
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
     conversation_id = sa.Column(sa.String, sa.ForeignKey("conversations.id"))
-    timestamp = sa.Column(sa.DateTime, default=datetime.utcnow)
+    timestamp = sa.Column(sa.DateTime, default=utcnow)
     role = sa.Column(sa.String)  # user, assistant, system
     content = sa.Column(sa.Text)
     tokens = sa.Column(sa.Integer, nullable=True)
-    embedding_id = sa.Column(sa.String, nullable=True)  # References Qdrant point
+    embedding_id = sa.Column(sa.String, nullable=True, index=True)  # References Qdrant point
+
+    __table_args__ = (
+        sa.Index("ix_messages_conv_ts", "conversation_id", "timestamp"),
+    )
 
 
 class Decision(Base):
@@ -45,7 +78,7 @@ class Decision(Base):
     
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
     conversation_id = sa.Column(sa.String, sa.ForeignKey("conversations.id"))
-    timestamp = sa.Column(sa.DateTime, default=datetime.utcnow)
+    timestamp = sa.Column(sa.DateTime, default=utcnow)
     decision_type = sa.Column(sa.String)
     context = sa.Column(sa.Text)
     outcome = sa.Column(sa.Text)
@@ -72,7 +105,7 @@ class Entity(Base):
 
     # Bi-temporal fields
     event_time = sa.Column(sa.DateTime, nullable=False)  # When this was true in reality
-    ingestion_time = sa.Column(sa.DateTime, default=datetime.utcnow, nullable=False)  # When we learned about it
+    ingestion_time = sa.Column(sa.DateTime, default=utcnow, nullable=False)  # When we learned about it
     valid_from = sa.Column(sa.DateTime, nullable=False)  # Start of validity period
     valid_until = sa.Column(sa.DateTime, nullable=True)  # End of validity (NULL = still valid)
 
@@ -88,6 +121,10 @@ class Entity(Base):
     relationships_out = sa_relationship("Relationship", foreign_keys="Relationship.source_entity_id", back_populates="source")
     relationships_in = sa_relationship("Relationship", foreign_keys="Relationship.target_entity_id", back_populates="target")
 
+    __table_args__ = (
+        sa.Index("ix_entities_validity", "valid_from", "valid_until"),
+    )
+
 
 class Relationship(Base):
     """
@@ -100,13 +137,13 @@ class Relationship(Base):
     __tablename__ = "relationships"
 
     id = sa.Column(sa.String, primary_key=True)
-    source_entity_id = sa.Column(sa.String, sa.ForeignKey("entities.id"), nullable=False, index=True)
+    source_entity_id = sa.Column(sa.String, sa.ForeignKey("entities.id"), nullable=False)
     target_entity_id = sa.Column(sa.String, sa.ForeignKey("entities.id"), nullable=False, index=True)
     relationship_type = sa.Column(sa.String, nullable=False, index=True)  # works_on, uses, knows, created, etc.
 
     # Bi-temporal fields
     event_time = sa.Column(sa.DateTime, nullable=False)
-    ingestion_time = sa.Column(sa.DateTime, default=datetime.utcnow, nullable=False)
+    ingestion_time = sa.Column(sa.DateTime, default=utcnow, nullable=False)
     valid_from = sa.Column(sa.DateTime, nullable=False)
     valid_until = sa.Column(sa.DateTime, nullable=True)
 
@@ -122,6 +159,10 @@ class Relationship(Base):
     source = sa_relationship("Entity", foreign_keys=[source_entity_id], back_populates="relationships_out")
     target = sa_relationship("Entity", foreign_keys=[target_entity_id], back_populates="relationships_in")
 
+    __table_args__ = (
+        sa.Index("ix_relationships_src_type", "source_entity_id", "relationship_type"),
+    )
+
 
 class EntityMention(Base):
     """
@@ -140,7 +181,7 @@ class EntityMention(Base):
     context_snippet = sa.Column(sa.Text, nullable=True)  # Surrounding context
     position = sa.Column(sa.Integer, nullable=True)  # Character position in message
 
-    timestamp = sa.Column(sa.DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = sa.Column(sa.DateTime, default=utcnow, nullable=False)
     confidence = sa.Column(sa.Float, default=1.0)
 
 
@@ -157,12 +198,23 @@ class TopicCluster(Base):
 
     # Cluster characteristics
     keywords = sa.Column(sa.JSON, default=list)  # Key terms in this cluster
-    entity_ids = sa.Column(sa.JSON, default=list)  # Related entities
-    conversation_ids = sa.Column(sa.JSON, default=list)  # Related conversations
+
+    # Members live in link tables so membership lookups can use an index;
+    # the proxies keep the plain list-of-IDs interface
+    entity_links = sa_relationship("TopicClusterEntity", cascade="all, delete-orphan")
+    conversation_links = sa_relationship("TopicClusterConversation", cascade="all, delete-orphan")
+    entity_ids = association_proxy(
+        "entity_links", "entity_id",
+        creator=lambda entity_id: TopicClusterEntity(entity_id=entity_id)
+    )  # Related entities
+    conversation_ids = association_proxy(
+        "conversation_links", "conversation_id",
+        creator=lambda conversation_id: TopicClusterConversation(conversation_id=conversation_id)
+    )  # Related conversations
 
     # Temporal tracking
-    created_at = sa.Column(sa.DateTime, default=datetime.utcnow, nullable=False)
-    last_updated = sa.Column(sa.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = sa.Column(sa.DateTime, default=utcnow, nullable=False)
+    last_updated = sa.Column(sa.DateTime, default=utcnow, onupdate=utcnow)
 
     # Metadata
     size = sa.Column(sa.Integer, default=0)  # Number of items in cluster
@@ -179,7 +231,7 @@ class SearchIndex(Base):
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
 
     # What's being indexed
-    item_type = sa.Column(sa.String, nullable=False, index=True)  # message, entity, relationship
+    item_type = sa.Column(sa.String, nullable=False)  # message, entity, relationship
     item_id = sa.Column(sa.String, nullable=False, index=True)
 
     # Search fields
@@ -188,11 +240,222 @@ class SearchIndex(Base):
     embedding_id = sa.Column(sa.String, nullable=True)  # Qdrant vector ID
 
     # Graph connections
-    connected_entity_ids = sa.Column(sa.JSON, default=list)  # Related entities
+    entity_links = sa_relationship("SearchIndexEntity", cascade="all, delete-orphan")
+    connected_entity_ids = association_proxy(
+        "entity_links", "entity_id",
+        creator=lambda entity_id: SearchIndexEntity(entity_id=entity_id)
+    )  # Related entities
 
     # Metadata
-    timestamp = sa.Column(sa.DateTime, default=datetime.utcnow, nullable=False)
-    last_indexed = sa.Column(sa.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    timestamp = sa.Column(sa.DateTime, default=utcnow, nullable=False)
+    last_indexed = sa.Column(sa.DateTime, default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        sa.Index("ix_search_index_item", "item_type", "item_id"),
+    )
+
+
+# ============================================================================
+# Link tables - many-to-many membership, indexed in both directions
+# (the composite primary key covers lookups by its leading column)
+# ============================================================================
+
+class TopicClusterEntity(Base):
+    __tablename__ = "topic_cluster_entities"
+
+    cluster_id = sa.Column(sa.String, sa.ForeignKey("topic_clusters.id"), primary_key=True)
+    entity_id = sa.Column(sa.String, sa.ForeignKey("entities.id"), primary_key=True, index=True)
+
+
+class TopicClusterConversation(Base):
+    __tablename__ = "topic_cluster_conversations"
+
+    cluster_id = sa.Column(sa.String, sa.ForeignKey("topic_clusters.id"), primary_key=True)
+    conversation_id = sa.Column(sa.String, sa.ForeignKey("conversations.id"), primary_key=True, index=True)
+
+
+class SearchIndexEntity(Base):
+    __tablename__ = "search_index_entities"
+
+    search_index_id = sa.Column(sa.Integer, sa.ForeignKey("search_index.id"), primary_key=True)
+    entity_id = sa.Column(sa.String, sa.ForeignKey("entities.id"), primary_key=True, index=True)
+
+
+# JSON list columns that held memberships before the link tables:
+# (owner table, JSON column, link table, owner key, member key, member table)
+LEGACY_MEMBERSHIP_COLUMNS = [
+    ("topic_clusters", "entity_ids", "topic_cluster_entities", "cluster_id", "entity_id", "entities"),
+    ("topic_clusters", "conversation_ids", "topic_cluster_conversations",
+     "cluster_id", "conversation_id", "conversations"),
+    ("search_index", "connected_entity_ids", "search_index_entities",
+     "search_index_id", "entity_id", "entities"),
+]
+
+
+def migrate_link_tables(connection) -> None:
+    """
+    Copy memberships from the legacy JSON list columns into the link tables.
+
+    IDs whose member row no longer exists are skipped. Copied columns are
+    cleared so a later schema upgrade cannot bring back removed links.
+    Intended for use with AsyncConnection.run_sync after create_all.
+    """
+    for table, column, link, owner_key, member_key, member_table in LEGACY_MEMBERSHIP_COLUMNS:
+        columns = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            continue
+        connection.exec_driver_sql(
+            f"""INSERT OR IGNORE INTO {link} ({owner_key}, {member_key})
+            SELECT t.id, j.value FROM {table} AS t, json_each(t.{column}) AS j
+            WHERE json_valid(t.{column}) AND j.value IN (SELECT id FROM {member_table})"""
+        )
+        connection.exec_driver_sql(f"UPDATE {table} SET {column} = NULL WHERE {column} IS NOT NULL")
+
+
+# ============================================================================
+# Full-text search - FTS5 indexes over messages, entities and the search index
+# ============================================================================
+
+# External-content FTS5 tables store only the inverted index; triggers keep
+# them in step with the source tables. Entity ids are strings, so entities
+# are indexed by their implicit rowid.
+FTS_TABLES = {
+    "messages_fts": [
+        """CREATE VIRTUAL TABLE messages_fts USING fts5(
+            content, content='messages', content_rowid='id',
+            tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER messages_fts_ai AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+        """CREATE TRIGGER messages_fts_ad AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END""",
+        """CREATE TRIGGER messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+    ],
+    "entities_fts": [
+        """CREATE VIRTUAL TABLE entities_fts USING fts5(
+            name, description, content='entities', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER entities_fts_ai AFTER INSERT ON entities BEGIN
+            INSERT INTO entities_fts(rowid, name, description)
+            VALUES (new.rowid, new.name, new.description);
+        END""",
+        """CREATE TRIGGER entities_fts_ad AFTER DELETE ON entities BEGIN
+            INSERT INTO entities_fts(entities_fts, rowid, name, description)
+            VALUES ('delete', old.rowid, old.name, old.description);
+        END""",
+        """CREATE TRIGGER entities_fts_au AFTER UPDATE OF name, description ON entities BEGIN
+            INSERT INTO entities_fts(entities_fts, rowid, name, description)
+            VALUES ('delete', old.rowid, old.name, old.description);
+            INSERT INTO entities_fts(rowid, name, description)
+            VALUES (new.rowid, new.name, new.description);
+        END""",
+    ],
+    # keywords is indexed as its JSON text; the tokenizer drops the punctuation
+    "search_index_fts": [
+        """CREATE VIRTUAL TABLE search_index_fts USING fts5(
+            content, keywords, content='search_index', content_rowid='id',
+            tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER search_index_fts_ai AFTER INSERT ON search_index BEGIN
+            INSERT INTO search_index_fts(rowid, content, keywords)
+            VALUES (new.id, new.content, new.keywords);
+        END""",
+        """CREATE TRIGGER search_index_fts_ad AFTER DELETE ON search_index BEGIN
+            INSERT INTO search_index_fts(search_index_fts, rowid, content, keywords)
+            VALUES ('delete', old.id, old.content, old.keywords);
+        END""",
+        """CREATE TRIGGER search_index_fts_au AFTER UPDATE OF content, keywords ON search_index BEGIN
+            INSERT INTO search_index_fts(search_index_fts, rowid, content, keywords)
+            VALUES ('delete', old.id, old.content, old.keywords);
+            INSERT INTO search_index_fts(rowid, content, keywords)
+            VALUES (new.id, new.content, new.keywords);
+        END""",
+    ],
+}
+
+
+def create_fts_tables(connection) -> None:
+    """
+    Create any missing FTS5 tables and their sync triggers.
+
+    Newly created indexes are rebuilt from the source table so databases
+    that predate full-text search get their existing rows indexed.
+    Intended for use with AsyncConnection.run_sync after create_all.
+    """
+    existing = {
+        row[0] for row in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+    for table, statements in FTS_TABLES.items():
+        if table in existing:
+            continue
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+# ============================================================================
+# Running totals - kept current by triggers so stats never scan messages
+# ============================================================================
+
+class Stats(Base):
+    """Single row (id 1) of conversation, message and token totals."""
+    __tablename__ = "stats"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    conversations = sa.Column(sa.Integer, nullable=False, default=0)
+    messages = sa.Column(sa.Integer, nullable=False, default=0)
+    total_tokens = sa.Column(sa.Integer, nullable=False, default=0)
+
+
+STATS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS stats_conversations_ai AFTER INSERT ON conversations BEGIN
+        UPDATE stats SET conversations = conversations + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_conversations_ad AFTER DELETE ON conversations BEGIN
+        UPDATE stats SET conversations = conversations - 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_messages_ai AFTER INSERT ON messages BEGIN
+        UPDATE stats SET messages = messages + 1,
+            total_tokens = total_tokens + coalesce(new.tokens, 0)
+        WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_messages_ad AFTER DELETE ON messages BEGIN
+        UPDATE stats SET messages = messages - 1,
+            total_tokens = total_tokens - coalesce(old.tokens, 0)
+        WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_messages_au AFTER UPDATE OF tokens ON messages BEGIN
+        UPDATE stats SET total_tokens = total_tokens - coalesce(old.tokens, 0) + coalesce(new.tokens, 0)
+        WHERE id = 1;
+    END""",
+]
+
+
+def create_stats_triggers(connection) -> None:
+    """
+    Create the stats triggers and seed the totals row from existing data.
+
+    Intended for use with AsyncConnection.run_sync after create_all.
+    """
+    for statement in STATS_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(
+        """INSERT OR IGNORE INTO stats (id, conversations, messages, total_tokens)
+        SELECT 1,
+            (SELECT count(*) FROM conversations),
+            (SELECT count(*) FROM messages),
+            (SELECT coalesce(sum(tokens), 0) FROM messages)"""
+    )
 
 
 # ============================================================================
@@ -227,11 +490,36 @@ def invalidate_entity(session, entity_id: str, as_of: Optional[datetime] = None)
         entity.valid_until = as_of
 
 
+# Walks currently valid relationships breadth-first in a single query; the
+# visited list keeps paths simple and the walk stops at the target.
+_RELATIONSHIP_PATHS_SQL = sa.text("""
+    WITH RECURSIVE paths(dst, rel_ids, visited, depth) AS (
+        SELECT target_entity_id, id, ',' || source_entity_id || ',' || target_entity_id || ',', 1
+        FROM relationships
+        WHERE source_entity_id = :source_id AND valid_until IS NULL
+        UNION ALL
+        SELECT r.target_entity_id, p.rel_ids || ',' || r.id, p.visited || r.target_entity_id || ',', p.depth + 1
+        FROM paths p
+        JOIN relationships r ON r.source_entity_id = p.dst
+        WHERE p.depth < :max_depth
+          AND p.dst != :target_id
+          AND r.valid_until IS NULL
+          AND instr(p.visited, ',' || r.target_entity_id || ',') = 0
+    )
+    SELECT rel_ids FROM paths WHERE dst = :target_id ORDER BY depth
+""")
+
+
 def get_relationship_paths(session, source_id: str, target_id: str, max_depth: int = 3):
     """
     Find all paths between two entities in the knowledge graph.
     Uses recursive CTE for efficient graph traversal.
+
+    Returns:
+        List of paths, shortest first, each a list of relationship IDs
     """
-    # This would use a recursive CTE in SQL
-    # Simplified version here - actual implementation would be more complex
-    pass
+    result = session.execute(
+        _RELATIONSHIP_PATHS_SQL,
+        {"source_id": source_id, "target_id": target_id, "max_depth": max_depth}
+    )
+    return [row.rel_ids.split(",") for row in result]
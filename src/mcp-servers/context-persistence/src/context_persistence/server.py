@@ -8,20 +8,37 @@ Local-first conversation history with semantic search using:
 """
 
 import asyncio
+import hashlib
+import importlib.util
+import itertools
 import os
+import threading
 from pathlib import Path
-from typing import Any, Optional
-from uuid import uuid4
-from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Optional
 import json
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
 
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.server.session import ServerSession
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    Batch,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    QueryRequest,
+    PointIdsList,
+)
+import numpy as np
 from sentence_transformers import SentenceTransformer
 import sqlalchemy as sa
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 import tiktoken
@@ -70,6 +87,25 @@ def resolve_mcp_home() -> Path:
 MCP_HOME = resolve_mcp_home()
 CONTEXT_DB = MCP_HOME / "context" / "db" / "conversation.db"
 QDRANT_PATH = MCP_HOME / "context" / "qdrant"
+QDRANT_URL = os.environ.get("QDRANT_URL")  # Optional Qdrant server; local storage otherwise
+EMBED_BATCH_SIZE = int(os.environ.get("MCP_EMBED_BATCH_SIZE", "64"))
+EMBED_CACHE_SIZE = int(os.environ.get("MCP_EMBED_CACHE_SIZE", "10000"))
+EMBED_BACKEND = os.environ.get("MCP_EMBED_BACKEND", "auto").lower()  # auto, torch, onnx, openvino
+EMBED_ONNX_FILE = os.environ.get("MCP_EMBED_ONNX_FILE")  # e.g. onnx/model_qint8_avx512_vnni.onnx
+QDRANT_UPSERT_BATCH = int(os.environ.get("MCP_QDRANT_UPSERT_BATCH", "256"))
+# Collections up to this size are searched from an in-process copy (0 disables).
+# Opt-in: every save reloads the copy, and other clients may write to a server
+MEMORY_SEARCH_LIMIT = int(os.environ.get("MCP_MEMORY_SEARCH_LIMIT", "0"))
+# Storage for the in-process copy: float32, float16 or int8
+MEMORY_SEARCH_DTYPE = os.environ.get("MCP_MEMORY_SEARCH_DTYPE", "float32")
+QUERY_CACHE_SIZE = int(os.environ.get("MCP_QUERY_CACHE_SIZE", "1024"))  # 0 disables
+QUERY_CACHE_THRESHOLD = float(os.environ.get("MCP_QUERY_CACHE_THRESHOLD", "0.97"))
+NLP_BATCH_SIZE = int(os.environ.get("MCP_NLP_BATCH_SIZE", "32"))
+NLP_N_PROCESS = int(os.environ.get("MCP_NLP_N_PROCESS", "1"))  # -1 uses all CPUs
+NLP_STREAM_BATCH = int(os.environ.get("MCP_NLP_STREAM_BATCH", "512"))  # messages per page
+# Noun-chunk concepts need spaCy's tagger and parser; off runs NER alone
+NLP_CONCEPTS = os.environ.get("MCP_NLP_CONCEPTS", "1").lower() in {"1", "true", "yes"}
+NLP_CACHE_SIZE = int(os.environ.get("MCP_NLP_CACHE_SIZE", "10000"))  # 0 disables
 
 # Ensure directories exist
 CONTEXT_DB.parent.mkdir(parents=True, exist_ok=True)
@@ -84,11 +120,17 @@ def sanitize_qdrant_metadata(meta_path: Path) -> None:
     client rejects during load. Cleaning it allows the local store to be
     reopened without wiping user data.
     """
-    if not meta_path.exists():
+    try:
+        raw = meta_path.read_bytes()
+    except OSError:
+        return
+
+    # Once cleaned, the file never needs parsing again
+    if b'"init_from"' not in raw:
         return
 
     try:
-        data = json.loads(meta_path.read_text())
+        data = json.loads(raw)
     except Exception:
         return
 
@@ -109,20 +151,29 @@ def sanitize_qdrant_metadata(meta_path: Path) -> None:
 Base = declarative_base()
 
 # Import models from models_enhanced to avoid circular imports
-from .models_enhanced import Conversation, Message, Decision, Entity, Relationship, EntityMention
+from .models_enhanced import Conversation, Message, Decision, Entity, Relationship, EntityMention, Stats, new_ids, utcnow
 
 # Global instances (initialized in lifespan)
 db_engine = None
 async_session = None
 qdrant_client = None
+qdrant_search_params = None
+# Embedded Qdrant (path mode) is not thread-safe; calls into it from worker
+# threads take this lock, while a Qdrant server handles concurrency itself
+_qdrant_lock = threading.Lock()
 embedding_model = None
 tokenizer = None
 
 # Phase 6 instances
 entity_extractor = None
+_nlp_lock = asyncio.Lock()
 knowledge_graph = None
 hybrid_search = None
 
+# LRU of content digest -> embedding, so repeated messages skip the model.
+# Vectors are kept as float32 arrays (~1.5 KB each) rather than lists of floats.
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
 @asynccontextmanager
 async def server_lifespan(app: FastMCP):
     """Proper async initialization with error handling"""
@@ -146,65 +197,255 @@ async def server_lifespan(app: FastMCP):
 mcp = FastMCP("Context Persistence", lifespan=server_lifespan)
 
 class _SimpleTokenizer:
-    """Fallback tokenizer that splits on whitespace and characters."""
+    """Fallback tokenizer that emits UTF-8 byte values as token IDs."""
 
     def encode(self, text: str) -> list[int]:
-        # Basic encoding: words get index, characters add entropy to spread values.
-        if not text:
-            return []
-        tokens = []
-        for word_idx, word in enumerate(text.split()):
-            tokens.append(word_idx + 1)
-            tokens.extend(ord(ch) for ch in word)
-        return tokens
+        # Byte-level IDs are produced in C and scale with text length like BPE counts
+        return list(text.encode("utf-8"))
+
+    def encode_batch(self, texts: list[str], **kwargs) -> list[bytes]:
+        # bytes already behave as sequences of ints, so skip the list copy
+        return [text.encode("utf-8") for text in texts]
 
+    # Same interface as tiktoken, which has no special tokens to skip here
+    encode_ordinary = encode
+    encode_ordinary_batch = encode_batch
 
 class _TokenHasher:
     """Deterministic, lightweight embedding fallback using token IDs."""
 
-    def encode(self, text: str):
-        # Spread token ids across a fixed-size vector to approximate similarity.
-        vector = [0.0] * 384
-        if tokenizer is None:
-            return vector
+    dim = 384
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer or _SimpleTokenizer()
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        # Mirror SentenceTransformer.encode: a string gives one vector,
+        # a list gives an (N, dim) array.
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = self.encode_batch(texts)
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors[0] if single else vectors
+
+    def encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed many texts into an (N, dim) float32 array"""
+        # Spread token ids across a fixed-size vector to approximate similarity:
+        # token i of a text adds its id to slot i % dim, for all texts at once.
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        token_ids = self.tokenizer.encode_ordinary_batch(texts)
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.intp, count=len(texts))
+        total = int(lengths.sum())
+        ids = np.fromiter(itertools.chain.from_iterable(token_ids), dtype=np.float64, count=total)
+
+        # Position of each token within its own text
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.arange(total) - starts
+        slots = np.repeat(np.arange(len(texts)) * self.dim, lengths) + positions % self.dim
+
+        vectors = np.bincount(slots, weights=ids, minlength=len(texts) * self.dim)
+        return vectors.reshape(len(texts), self.dim).astype(np.float32)
+
+class _QueryCache:
+    """
+    Recent search results keyed by query embedding.
+
+    A new query reuses the results of an earlier one with the same limit
+    and min_score whose (unit-length) embedding is at least `threshold`
+    similar. Entries live in a fixed ring buffer; the oldest is replaced
+    once it is full. Results are copied in and out, so callers may modify
+    what they get back.
+    """
 
-        for idx, token_id in enumerate(tokenizer.encode(text)):
-            vector[idx % len(vector)] += float(token_id)
-        return vector
+    def __init__(self, capacity: int, threshold: float, dim: int = 384):
+        self.threshold = threshold
+        self._vectors = np.zeros((max(capacity, 0), dim), dtype=np.float32)
+        self._entries: list[Optional[tuple[int, float, tuple[dict[str, Any], ...]]]] = [None] * max(capacity, 0)
+        self._size = 0
+        self._next = 0
+
+    def get(self, vector: list[float], limit: int, min_score: float) -> Optional[list[dict[str, Any]]]:
+        if not self._size:
+            return None
+        scores = self._vectors[:self._size] @ np.asarray(vector, dtype=np.float32)
+        for idx in np.argsort(scores)[::-1]:
+            if scores[idx] < self.threshold:
+                break
+            cached_limit, cached_min_score, results = self._entries[idx]
+            if cached_limit == limit and cached_min_score == min_score:
+                return [dict(result) for result in results]
+        return None
+
+    def put(self, vector: list[float], limit: int, min_score: float, results: list[dict[str, Any]]) -> None:
+        if not len(self._entries):
+            return
+        self._vectors[self._next] = vector
+        self._entries[self._next] = (limit, min_score, tuple(dict(result) for result in results))
+        self._next = (self._next + 1) % len(self._entries)
+        self._size = min(self._size + 1, len(self._entries))
+
+    def clear(self) -> None:
+        self._entries = [None] * len(self._entries)
+        self._size = 0
+        self._next = 0
+
+# Near-duplicate search queries reuse earlier results until the next save
+_query_cache = _QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_THRESHOLD)
+
+# Stored in PRAGMA user_version; bump whenever tables, indexes or FTS
+# definitions change so existing databases rerun schema setup once
+SCHEMA_VERSION = 5
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply write-friendly SQLite settings to every new connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
 
 async def init_database():
     """Initialize SQLite database"""
     global db_engine, async_session
 
     db_url = f"sqlite+aiosqlite:///{CONTEXT_DB}"
-    db_engine = create_async_engine(db_url, echo=False)
+    # Wait on a busy WAL writer instead of failing with "database is locked"
+    db_engine = create_async_engine(
+        db_url,
+        echo=False,
+        connect_args={"check_same_thread": False, "timeout": 30},
+        # Keep connections open across tool calls so the pragmas run once each
+        poolclass=sa.pool.AsyncAdaptedQueuePool,
+        pool_size=5,
+        max_overflow=10
+    )
+    event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
 
     # Import all models including Phase 6 models
-    from .models_enhanced import Base as EnhancedBase
+    from .models_enhanced import (
+        Base as EnhancedBase, create_fts_tables, create_stats_triggers, migrate_link_tables
+    )
 
     async with db_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        await conn.run_sync(EnhancedBase.metadata.create_all)
+        # Skip schema probing when the database is already current
+        version = (await conn.exec_driver_sql("PRAGMA user_version")).scalar()
+        if version != SCHEMA_VERSION:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(EnhancedBase.metadata.create_all)
+            # create_all skips new indexes on tables that already exist
+            for table in EnhancedBase.metadata.sorted_tables:
+                for index in table.indexes:
+                    await conn.run_sync(index.create, checkfirst=True)
+            await conn.run_sync(migrate_link_tables)
+            await conn.run_sync(create_fts_tables)
+            await conn.run_sync(create_stats_triggers)
+            await conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     async_session = sessionmaker(
         db_engine, class_=AsyncSession, expire_on_commit=False
     )
 
+def select_hnsw_profile(vector_count: int) -> tuple[int, int, int]:
+    """
+    Pick HNSW parameters for a collection of the given size.
+
+    Returns:
+        Tuple of (m, ef_construct, hnsw_ef); larger collections trade
+        memory and build time for recall.
+    """
+    if vector_count < 100_000:
+        return 24, 200, 128
+    if vector_count < 1_000_000:
+        return 32, 256, 192
+    return 48, 400, 256
+
+def qdrant_guard() -> AbstractContextManager:
+    """Context to hold around every qdrant_client call"""
+    return nullcontext() if QDRANT_URL else _qdrant_lock
+
+def call_qdrant(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call a qdrant_client method under qdrant_guard(); for asyncio.to_thread"""
+    with qdrant_guard():
+        return method(*args, **kwargs)
+
 async def init_qdrant():
-    """Initialize Qdrant local client"""
-    global qdrant_client
-    
-    sanitize_qdrant_metadata(QDRANT_PATH / "meta.json")
-    qdrant_client = QdrantClient(path=str(QDRANT_PATH))
+    """Initialize Qdrant client (local storage unless QDRANT_URL is set)"""
+    global qdrant_client, qdrant_search_params
+
+    if QDRANT_URL:
+        qdrant_client = QdrantClient(url=QDRANT_URL)
+    else:
+        sanitize_qdrant_metadata(QDRANT_PATH / "meta.json")
+        qdrant_client = QdrantClient(path=str(QDRANT_PATH))
     
     # Create collection for message embeddings
     try:
-        qdrant_client.get_collection("messages")
+        await asyncio.to_thread(call_qdrant, qdrant_client.get_collection, "messages")
     except Exception:
-        qdrant_client.create_collection(
+        m, ef_construct, _ = select_hnsw_profile(0)
+        await asyncio.to_thread(
+            call_qdrant,
+            qdrant_client.create_collection,
             collection_name="messages",
-            vectors_config=VectorParams(size=384, distance=Distance.COSINE)
+            # Embeddings are normalized at encode time, so DOT ranks like COSINE;
+            # full-precision originals stay on disk and are only read to rescore
+            vectors_config=VectorParams(size=384, distance=Distance.DOT, on_disk=True),
+            hnsw_config=HnswConfigDiff(m=m, ef_construct=ef_construct),
+            # int8 copies kept in RAM for scoring; originals are used for rescoring
+            quantization_config=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        )
+
+    if QDRANT_URL:
+        # Size the query beam to the collection; the graph itself is not rebuilt here
+        vector_count = (
+            await asyncio.to_thread(call_qdrant, qdrant_client.count, "messages", exact=False)
+        ).count
+        _, _, hnsw_ef = select_hnsw_profile(vector_count)
+        # Score on int8 vectors, then rescore the oversampled top hits in full precision
+        qdrant_search_params = SearchParams(
+            hnsw_ef=hnsw_ef,
+            quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
         )
+    else:
+        # Local mode is exact brute-force search and ignores search params
+        qdrant_search_params = None
+
+def _embedding_backend_kwargs() -> dict[str, Any]:
+    """SentenceTransformer kwargs for the configured inference backend"""
+    backend = EMBED_BACKEND
+    if backend == "auto":
+        # ONNX Runtime encodes MiniLM several times faster than PyTorch on CPU
+        has_onnx = all(importlib.util.find_spec(m) for m in ("onnxruntime", "optimum"))
+        backend = "onnx" if has_onnx else "torch"
+    if backend == "torch":
+        return {}
+
+    kwargs: dict[str, Any] = {"backend": backend}
+    if EMBED_ONNX_FILE:
+        kwargs["model_kwargs"] = {"file_name": EMBED_ONNX_FILE}
+    return kwargs
+
+def _load_embedding_model(**kwargs) -> SentenceTransformer:
+    """Load the embedding model on the configured backend, falling back to PyTorch"""
+    backend_kwargs = _embedding_backend_kwargs()
+    if backend_kwargs:
+        try:
+            return SentenceTransformer("all-MiniLM-L6-v2", **backend_kwargs, **kwargs)
+        except Exception as backend_error:
+            print(f"⚠️  {backend_kwargs['backend']} backend unavailable, using PyTorch: {backend_error}")
+    return SentenceTransformer("all-MiniLM-L6-v2", **kwargs)
 
 async def init_models():
     """Initialize embedding model and tokenizer"""
@@ -222,34 +463,144 @@ async def init_models():
     }
 
     try:
-        embedding_model = SentenceTransformer(
-            "all-MiniLM-L6-v2",
-            local_files_only=True
-        )
+        embedding_model = _load_embedding_model(local_files_only=True)
     except Exception:
         if allow_download:
             try:
-                embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+                embedding_model = _load_embedding_model()
             except Exception as download_error:
                 print(f"⚠️  Falling back to hashing embeddings (download failed): {download_error}")
-                embedding_model = _TokenHasher()
+                embedding_model = _TokenHasher(tokenizer)
         else:
             print("⚠️  Using hashing embeddings (set MCP_ALLOW_MODEL_DOWNLOAD=1 to allow model download)")
-            embedding_model = _TokenHasher()
+            embedding_model = _TokenHasher(tokenizer)
+
+    # Cached vectors are only valid for the model that produced them
+    _embedding_cache.clear()
+    _query_cache.clear()
 
     # Initialize Phase 6 components
-    entity_extractor = EntityExtractor()
+    entity_extractor = EntityExtractor(cache_size=NLP_CACHE_SIZE, concepts=NLP_CONCEPTS)
     knowledge_graph = KnowledgeGraph()
-    hybrid_search = HybridSearch(qdrant_client, embedding_model, knowledge_graph)
+    hybrid_search = HybridSearch(
+        qdrant_client,
+        embedding_model,
+        knowledge_graph,
+        search_params=qdrant_search_params,
+        memory_search_limit=MEMORY_SEARCH_LIMIT,
+        memory_search_dtype=MEMORY_SEARCH_DTYPE,
+        session_factory=async_session,
+        qdrant_lock=qdrant_guard()
+    )
+
+def upsert_points(
+    ids: list[str],
+    vectors: list[list[float]],
+    payloads: list[dict[str, Any]]
+) -> None:
+    """
+    Upload points to the messages collection in bounded column batches.
+
+    Intermediate batches are sent without waiting for indexing; the last
+    batch waits, and since Qdrant applies updates in order this keeps a
+    save visible to searches issued right after it returns.
+    """
+    with qdrant_guard():
+        for start in range(0, len(ids), QDRANT_UPSERT_BATCH):
+            end = start + QDRANT_UPSERT_BATCH
+            qdrant_client.upsert(
+                collection_name="messages",
+                points=Batch(ids=ids[start:end], vectors=vectors[start:end], payloads=payloads[start:end]),
+                wait=end >= len(ids)
+            )
+
+def delete_points(ids: list[str]) -> None:
+    """Remove points from the messages collection"""
+    with qdrant_guard():
+        qdrant_client.delete(
+            collection_name="messages",
+            points_selector=PointIdsList(points=ids)
+        )
 
+async def bulk_save_messages(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Insert message rows with a single executemany INSERT.
+
+    Bypasses the ORM unit of work, so the parent Conversation row must
+    already be flushed and the inserted rows are not added to the session.
+    """
+    if rows:
+        await session.execute(sa.insert(Message), rows)
+
+# The ordinary encoders skip tiktoken's special-token scan, which also
+# rejects text containing markers such as "<|endoftext|>"
 def count_tokens(text: str) -> int:
     """Count tokens in text"""
-    return len(tokenizer.encode(text))
+    return len(tokenizer.encode_ordinary(text))
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Count tokens for many texts in one batched tokenizer call"""
+    if not texts:
+        return []
+    token_ids = tokenizer.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+    return [len(ids) for ids in token_ids]
+
+def _embedding_key(text: str) -> bytes:
+    """Digest used to key the embedding cache"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def _encode_texts(texts: list[str]) -> np.ndarray:
+    """Run the embedding model on texts; blocking, so call it from a worker thread"""
+    # SentenceTransformer length-sorts inputs internally, so batches stay tightly padded
+    return embedding_model.encode(
+        texts,
+        batch_size=EMBED_BATCH_SIZE,
+        convert_to_numpy=True,
+        # Unit-length vectors let the collection score with a plain dot product
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
 
-def generate_embedding(text: str) -> list[float]:
+async def generate_embedding(text: str) -> list[float]:
     """Generate embedding for text"""
-    embedding = embedding_model.encode(text)
-    return embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+    return (await generate_embeddings([text]))[0]
+
+async def generate_embeddings(texts: list[str]) -> list[list[float]]:
+    """
+    Generate embeddings for many texts with a single batched encode call.
+
+    Texts already in the embedding cache (or repeated within the batch) are
+    only encoded once. The model runs in a worker thread so other tool calls
+    keep being served meanwhile; the cache itself is only touched on the
+    event loop.
+    """
+    embeddings: list[Optional[list[float]]] = [None] * len(texts)
+    misses: dict[bytes, list[int]] = {}
+
+    for idx, text in enumerate(texts):
+        key = _embedding_key(text)
+        cached = _embedding_cache.get(key)
+        if cached is None:
+            misses.setdefault(key, []).append(idx)
+        else:
+            _embedding_cache.move_to_end(key)
+            embeddings[idx] = cached.tolist()
+
+    if misses:
+        encoded = await asyncio.to_thread(
+            _encode_texts, [texts[positions[0]] for positions in misses.values()]
+        )
+        for (key, positions), embedding in zip(misses.items(), encoded):
+            cached = np.asarray(embedding, dtype=np.float32)
+            _embedding_cache[key] = cached
+            vector = cached.tolist()
+            for idx in positions:
+                embeddings[idx] = vector
+
+        while len(_embedding_cache) > EMBED_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+    return embeddings
 
 @mcp.tool()
 async def save_conversation(
@@ -275,7 +626,8 @@ async def save_conversation(
     async with async_session() as session:
         # Create or update conversation
         conv = await session.get(Conversation, conversation_id)
-        if not conv:
+        created = conv is None
+        if created:
             conv = Conversation(
                 id=conversation_id,
                 project_path=project_path,
@@ -283,51 +635,81 @@ async def save_conversation(
                 meta_data=metadata or {}
             )
             session.add(conv)
+            # Parent row must exist before the bulk message insert
+            await session.flush()
         
-        # Save messages and generate embeddings
-        points = []
-        for msg in messages:
-            content = msg.get("content", "")
+        # Embed and tokenize all messages in one batched pass
+        contents = [msg.get("content", "") for msg in messages]
+        embeddings, token_counts = await asyncio.gather(
+            generate_embeddings(contents),
+            asyncio.to_thread(count_tokens_batch, contents)
+        )
+
+        # Build message rows and Qdrant point columns
+        # One timestamp for the whole save, stamped on rows and payloads alike
+        saved_at = utcnow()
+        saved_at_iso = saved_at.isoformat()
+        message_rows = []
+        point_ids = []
+        payloads = []
+        # Qdrant expects UUID-friendly point ids; generate instead of deriving
+        embedding_ids = new_ids(len(messages))
+        for msg, content, tokens, embedding_id in zip(messages, contents, token_counts, embedding_ids):
             role = msg.get("role", "user")
             
-            # Count tokens
-            tokens = count_tokens(content)
-            
-            # Generate embedding
-            embedding = generate_embedding(content)
-            # Qdrant expects UUID-friendly point ids; generate instead of deriving
-            embedding_id = str(uuid4())
-            
-            # Create message record
-            message = Message(
-                conversation_id=conversation_id,
-                role=role,
-                content=content,
-                tokens=tokens,
-                embedding_id=embedding_id
-            )
-            session.add(message)
+            message_rows.append({
+                "conversation_id": conversation_id,
+                "role": role,
+                "content": content,
+                "tokens": tokens,
+                "embedding_id": embedding_id,
+                "timestamp": saved_at
+            })
             
-            # Prepare Qdrant point
-            points.append(PointStruct(
-                id=embedding_id,
-                vector=embedding,
-                payload={
-                    "conversation_id": conversation_id,
-                    "role": role,
-                    "content": content,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            ))
-        
-        await session.commit()
+            # Prepare Qdrant payload; content lives only in SQLite and is
+            # looked up by embedding_id for the few points a search returns
+            point_ids.append(embedding_id)
+            payloads.append({
+                "conversation_id": conversation_id,
+                "role": role,
+                "timestamp": saved_at_iso
+            })
         
-        # Upload embeddings to Qdrant
-        qdrant_client.upsert(
-            collection_name="messages",
-            points=points
+        # Single executemany INSERT instead of per-row ORM flushes
+        await bulk_save_messages(session, message_rows)
+
+        # Commit and upload embeddings concurrently; the Qdrant client is blocking
+        committed, uploaded = await asyncio.gather(
+            session.commit(),
+            asyncio.to_thread(upsert_points, point_ids, embeddings, payloads),
+            return_exceptions=True
         )
         
+        # Undo the side that succeeded so rows never reference missing points
+        # and searches never return points without a row
+        error = committed if isinstance(committed, BaseException) else uploaded
+        if isinstance(error, BaseException):
+            try:
+                if point_ids and not isinstance(uploaded, BaseException):
+                    await asyncio.to_thread(delete_points, point_ids)
+                if not isinstance(committed, BaseException):
+                    await session.execute(
+                        sa.delete(Message).where(Message.embedding_id.in_(point_ids))
+                    )
+                    if created:
+                        await session.execute(
+                            sa.delete(Conversation).where(Conversation.id == conversation_id)
+                        )
+                    await session.commit()
+            except Exception as cleanup_error:
+                # Report, but raise the failure that aborted the save
+                print(f"⚠️  Cleanup after failed save failed: {cleanup_error}")
+            raise error
+        
+        # Earlier search results may now be missing these messages
+        _query_cache.clear()
+        hybrid_search.invalidate_vectors()
+        
         return {
             "conversation_id": conversation_id,
             "message_count": len(messages),
@@ -351,34 +733,89 @@ async def search_similar_conversations(
     Returns:
         List of matching messages with conversation context
     """
-    # Generate query embedding
-    query_embedding = generate_embedding(query)
+    return (await search_similar_batch([query], limit, min_score))[0]
+
+@mcp.tool()
+async def search_similar_batch(
+    queries: list[str],
+    limit: int = 5,
+    min_score: float = 0.7
+) -> list[list[dict[str, Any]]]:
+    """
+    Search for similar conversations for several queries at once.
+    
+    Queries are embedded in one batch and sent to Qdrant in a single
+    batched request, so N queries cost about as much as one.
+    
+    Args:
+        queries: Search query texts
+        limit: Maximum number of results per query
+        min_score: Minimum similarity score (0-1)
+    
+    Returns:
+        One list of matching messages per query, in query order
+    """
+    # Generate query embeddings
+    query_embeddings = await generate_embeddings(queries)
+    
+    matches: list[Optional[list[dict[str, Any]]]] = [
+        _query_cache.get(embedding, limit, min_score) for embedding in query_embeddings
+    ]
+    pending = [idx for idx, cached in enumerate(matches) if cached is None]
+    if not pending:
+        return matches
     
-    # Search in Qdrant
-    results = qdrant_client.query_points(
+    # Search in Qdrant off the event loop
+    responses = await asyncio.to_thread(
+        call_qdrant,
+        qdrant_client.query_batch_points,
         collection_name="messages",
-        query=query_embedding,
-        limit=limit,
-        score_threshold=min_score
-    ).points
+        requests=[
+            QueryRequest(
+                query=query_embeddings[idx],
+                limit=limit,
+                score_threshold=min_score,
+                with_payload=["conversation_id", "role", "timestamp", "content"],
+                params=qdrant_search_params
+            )
+            for idx in pending
+        ]
+    )
+    
+    # Fetch message content for every returned point in one query
+    point_ids = {str(point.id) for response in responses for point in response.points}
+    contents = {}
+    if point_ids:
+        async with async_session() as session:
+            rows = await session.execute(
+                sa.select(Message.embedding_id, Message.content).where(
+                    Message.embedding_id.in_(list(point_ids))
+                )
+            )
+            contents = dict(rows.all())
     
     # Format results
-    matches = []
-    for result in results:
-        matches.append({
-            "conversation_id": result.payload["conversation_id"],
-            "role": result.payload["role"],
-            "content": result.payload["content"],
-            "timestamp": result.payload["timestamp"],
-            "similarity_score": result.score
-        })
+    for idx, response in zip(pending, responses):
+        matches[idx] = [
+            {
+                "conversation_id": point.payload["conversation_id"],
+                "role": point.payload["role"],
+                # Points written before content left the payload still carry it
+                "content": contents.get(str(point.id), point.payload.get("content", "")),
+                "timestamp": point.payload["timestamp"],
+                "similarity_score": point.score
+            }
+            for point in response.points
+        ]
+        _query_cache.put(query_embeddings[idx], limit, min_score, matches[idx])
     
     return matches
 
 @mcp.tool()
 async def load_conversation_history(
     conversation_id: str,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    offset: int = 0
 ) -> dict[str, Any]:
     """
     Load conversation history from local storage.
@@ -386,26 +823,57 @@ async def load_conversation_history(
     Args:
         conversation_id: Conversation identifier
         limit: Optional limit on number of messages to return
+        offset: Number of messages to skip, for paging through long histories
     
     Returns:
         Conversation data with messages
     """
     async with async_session() as session:
-        # Get conversation
-        conv = await session.get(Conversation, conversation_id)
-        if not conv:
-            return {"error": "Conversation not found"}
-        
-        # Get messages
-        query = sa.select(Message).where(
+        # Page messages in a subquery; plain columns skip ORM identity-map
+        # overhead and the (conversation_id, timestamp) index serves the ordering
+        page = sa.select(
+            Message.id, Message.role, Message.content, Message.timestamp, Message.tokens
+        ).where(
             Message.conversation_id == conversation_id
-        ).order_by(Message.timestamp)
+        ).order_by(Message.timestamp, Message.id)
         
         if limit:
-            query = query.limit(limit)
+            page = page.limit(limit)
+        if offset:
+            page = page.offset(offset)
+        page = page.subquery()
         
-        result = await session.execute(query)
-        messages = result.scalars().all()
+        # Outer join the page onto the conversation so a single round-trip
+        # returns both, with one null-message row when the page is empty
+        query = sa.select(
+            Conversation.started_at,
+            Conversation.project_path,
+            Conversation.mode,
+            Conversation.meta_data,
+            page
+        ).select_from(Conversation).outerjoin(
+            page, sa.true()
+        ).where(
+            Conversation.id == conversation_id
+        ).order_by(page.c.timestamp, page.c.id)
+        
+        result = await session.stream(query.execution_options(yield_per=500))
+        conv = None
+        messages = []
+        async for row in result:
+            conv = row
+            if row.id is None:
+                continue
+            messages.append({
+                "id": row.id,
+                "role": row.role,
+                "content": row.content,
+                "timestamp": row.timestamp.isoformat(),
+                "tokens": row.tokens
+            })
+        
+        if conv is None:
+            return {"error": "Conversation not found"}
         
         return {
             "conversation_id": conversation_id,
@@ -413,16 +881,7 @@ async def load_conversation_history(
             "project_path": conv.project_path,
             "mode": conv.mode,
             "metadata": conv.meta_data,
-            "messages": [
-                {
-                    "id": msg.id,
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat(),
-                    "tokens": msg.tokens
-                }
-                for msg in messages
-            ]
+            "messages": messages
         }
 
 @mcp.tool()
@@ -449,7 +908,8 @@ async def save_decision(
             conversation_id=conversation_id,
             decision_type=decision_type,
             context=context,
-            outcome=outcome
+            outcome=outcome,
+            timestamp=utcnow()
         )
         session.add(decision)
         await session.commit()
@@ -468,25 +928,16 @@ async def get_conversation_stats() -> dict[str, Any]:
         Stats including conversation count, message count, total tokens
     """
     async with async_session() as session:
-        # Count conversations
-        conv_count = await session.execute(
-            sa.select(sa.func.count(Conversation.id))
-        )
-        
-        # Count messages
-        msg_count = await session.execute(
-            sa.select(sa.func.count(Message.id))
-        )
-        
-        # Sum tokens
-        token_sum = await session.execute(
-            sa.select(sa.func.sum(Message.tokens))
+        # Triggers keep the totals current, so this is a primary-key lookup
+        result = await session.execute(
+            sa.select(Stats.conversations, Stats.messages, Stats.total_tokens).where(Stats.id == 1)
         )
+        conv_count, msg_count, token_sum = result.one()
         
         return {
-            "conversations": conv_count.scalar(),
-            "messages": msg_count.scalar(),
-            "total_tokens": token_sum.scalar() or 0,
+            "conversations": conv_count,
+            "messages": msg_count,
+            "total_tokens": token_sum,
             "database_path": str(CONTEXT_DB),
             "qdrant_path": str(QDRANT_PATH)
         }
@@ -495,6 +946,47 @@ async def get_conversation_stats() -> dict[str, Any]:
 # Phase 6 MCP Tools - Entity Extraction, Knowledge Graph, Hybrid Search
 # ============================================================================
 
+async def _extract_batch(items: list[tuple[str, str, Optional[int]]]) -> list[dict[str, Any]]:
+    """Extract entities from (text, conversation_id, message_id) items on a worker thread"""
+    # spaCy is CPU-bound, so keep it off the event loop
+    return await asyncio.to_thread(
+        entity_extractor.extract_entities_batch,
+        items,
+        batch_size=NLP_BATCH_SIZE,
+        n_process=NLP_N_PROCESS
+    )
+
+async def _message_pages(
+    conversation_id: str,
+    message_id: Optional[int] = None
+) -> AsyncIterator[list[tuple[str, int]]]:
+    """
+    Yield a conversation's (content, id) rows in id order, one page at a time.
+
+    Each page is read in its own short session, keyed on the last id seen,
+    so no connection is held while the caller works on a page.
+    """
+    last_id = 0
+    while True:
+        query = sa.select(Message.content, Message.id).where(
+            Message.conversation_id == conversation_id,
+            Message.id > last_id
+        )
+        if message_id:
+            query = query.where(Message.id == message_id)
+
+        async with async_session() as session:
+            result = await session.execute(
+                query.order_by(Message.id).limit(NLP_STREAM_BATCH)
+            )
+            rows = result.all()
+
+        if rows:
+            yield rows
+        if len(rows) < NLP_STREAM_BATCH:
+            return
+        last_id = rows[-1][1]
+
 @mcp.tool()
 async def extract_entities(
     conversation_id: str,
@@ -512,49 +1004,42 @@ async def extract_entities(
     Returns:
         Dictionary with extracted entities
     """
-    async with async_session() as session:
+    # The spaCy pipeline is not thread-safe, so one extraction at a time
+    async with _nlp_lock:
         # If text provided, extract directly
         if text:
-            entities = entity_extractor.extract_entities(
-                text, conversation_id, message_id
-            )
+            entities = await _extract_batch([(text, conversation_id, message_id)])
         else:
-            # Extract from conversation messages
-            query = sa.select(Message).where(
-                Message.conversation_id == conversation_id
-            )
-            if message_id:
-                query = query.where(Message.id == message_id)
-
-            result = await session.execute(query)
-            messages = result.scalars().all()
-
+            # Extract page by page, so long conversations are never held in
+            # memory whole and no connection sits idle during NLP
             entities = []
-            for msg in messages:
-                msg_entities = entity_extractor.extract_entities(
-                    msg.content, conversation_id, msg.id
-                )
-                entities.extend(msg_entities)
-
-        # Deduplicate
-        entities = entity_extractor.deduplicate_entities(entities)
-
-        # Save to database
+            async for rows in _message_pages(conversation_id, message_id):
+                entities.extend(await _extract_batch(
+                    [(content, conversation_id, msg_id) for content, msg_id in rows]
+                ))
+
+    # Deduplicate
+    entities = entity_extractor.deduplicate_entities(entities)
+
+    # Save to database with one executemany INSERT, skipping the ORM
+    # unit of work for what can be thousands of rows
+    if entities:
+        async with async_session() as session:
+            await session.execute(sa.insert(Entity), entities)
+            await session.commit()
+
+    # Patch the new rows into a loaded graph; an unloaded one is built
+    # in full on first use
+    if knowledge_graph.is_current:
         for entity_data in entities:
-            entity = Entity(**entity_data)
-            session.add(entity)
-
-        await session.commit()
-
-        # Rebuild knowledge graph
-        await knowledge_graph.build_graph(session)
+            knowledge_graph.add_entity_node(entity_data)
 
-        return {
-            "conversation_id": conversation_id,
-            "entities_extracted": len(entities),
-            "entity_types": list(set(e["entity_type"] for e in entities)),
-            "entities": entities[:20]  # Return first 20 for preview
-        }
+    return {
+        "conversation_id": conversation_id,
+        "entities_extracted": len(entities),
+        "entity_types": sorted({e["entity_type"] for e in entities}),
+        "entities": entities[:20]  # Return first 20 for preview
+    }
 
 
 @mcp.tool()
@@ -587,33 +1072,67 @@ async def create_relationship(
             return {"error": "One or both entities not found"}
 
         # Create relationship
-        now = datetime.utcnow()
-        relationship = Relationship(
-            id=str(uuid4()),
-            source_entity_id=source_entity_id,
-            target_entity_id=target_entity_id,
-            relationship_type=relationship_type,
-            event_time=now,
-            ingestion_time=now,
-            valid_from=now,
-            valid_until=None,
-            confidence=confidence,
-            properties=properties or {}
-        )
+        now = utcnow()
+        relationship = {
+            "id": new_ids(1)[0],
+            "source_entity_id": source_entity_id,
+            "target_entity_id": target_entity_id,
+            "relationship_type": relationship_type,
+            "event_time": now,
+            "ingestion_time": now,
+            "valid_from": now,
+            "valid_until": None,
+            "confidence": confidence,
+            "properties": properties or {}
+        }
 
-        session.add(relationship)
+        session.add(Relationship(**relationship))
         await session.commit()
 
-        # Rebuild knowledge graph
-        await knowledge_graph.build_graph(session)
+        # Patch the new edge into a loaded graph; an unloaded one is built
+        # in full on first use
+        if knowledge_graph.is_current:
+            knowledge_graph.add_relationship_edge(relationship)
 
         return {
             "status": "created",
-            "relationship_id": relationship.id,
+            "relationship_id": relationship["id"],
             "relationship_type": relationship_type
         }
 
 
+def _graph_centrality(kg: KnowledgeGraph, entity_id: str, depth: int) -> dict[str, Any]:
+    """Top entities by PageRank, with their names"""
+    scores = kg.get_centrality_scores(limit=20)
+    nodes = kg.graph.nodes
+    return {
+        "centrality_scores": [
+            {
+                "entity_id": eid,
+                "name": nodes[eid].get("name"),
+                "centrality_score": score
+            }
+            for eid, score in scores.items()
+            if eid in nodes
+        ]
+    }
+
+
+def _graph_visualize(kg: KnowledgeGraph, entity_id: str, depth: int) -> dict[str, Any]:
+    """Mermaid diagram of the most connected part of the graph"""
+    return {"mermaid": kg.visualize_mermaid(entity_ids=None, max_nodes=30)}
+
+
+# query_knowledge_graph operations, called as handler(graph, entity_id, depth)
+_GRAPH_OPERATIONS: dict[str, Callable[[KnowledgeGraph, str, int], dict[str, Any]]] = {
+    "context": lambda kg, entity_id, depth: kg.get_entity_context(entity_id, depth),
+    "neighbors": lambda kg, entity_id, depth: kg.get_neighbors(entity_id, depth),
+    "stats": lambda kg, entity_id, depth: kg.get_graph_stats(),
+    "centrality": _graph_centrality,
+    "visualize": _graph_visualize,
+}
+
+
 @mcp.tool()
 async def query_knowledge_graph(
     entity_id: str,
@@ -626,48 +1145,20 @@ async def query_knowledge_graph(
     Args:
         entity_id: Entity to query
         depth: Depth of graph traversal
-        operation: Operation type (context, neighbors, paths)
+        operation: Operation type (context, neighbors, stats, centrality, visualize)
 
     Returns:
         Graph query results
     """
+    handler = _GRAPH_OPERATIONS.get(operation)
+    if handler is None:
+        return {"error": f"Unknown operation: {operation}"}
+
     async with async_session() as session:
-        # Ensure graph is built
-        if knowledge_graph.graph.number_of_nodes() == 0:
-            await knowledge_graph.build_graph(session)
-
-        if operation == "context":
-            return knowledge_graph.get_entity_context(entity_id, depth)
-
-        elif operation == "neighbors":
-            return knowledge_graph.get_neighbors(entity_id, depth)
-
-        elif operation == "stats":
-            return knowledge_graph.get_graph_stats()
-
-        elif operation == "centrality":
-            scores = knowledge_graph.get_centrality_scores(limit=20)
-            # Add entity names to scores
-            results = []
-            for eid, score in scores.items():
-                if eid in knowledge_graph.graph:
-                    results.append({
-                        "entity_id": eid,
-                        "name": knowledge_graph.graph.nodes[eid].get("name"),
-                        "centrality_score": score
-                    })
-            return {"centrality_scores": results}
-
-        elif operation == "visualize":
-            return {
-                "mermaid": knowledge_graph.visualize_mermaid(
-                    entity_ids=None,
-                    max_nodes=30
-                )
-            }
+        # Load the graph, or apply writes made since it was loaded
+        await knowledge_graph.ensure_current(session)
 
-        else:
-            return {"error": f"Unknown operation: {operation}"}
+    return handler(knowledge_graph, entity_id, depth)
 
 
 @mcp.tool()
@@ -690,10 +1181,9 @@ async def search_hybrid(
         List of search results with scores
     """
     async with async_session() as session:
-        # Ensure knowledge graph is built for graph search
+        # Ensure knowledge graph is current for graph search
         if mode in ("hybrid", "graph"):
-            if knowledge_graph.graph.number_of_nodes() == 0:
-                await knowledge_graph.build_graph(session)
+            await knowledge_graph.ensure_current(session)
 
         results = await hybrid_search.search(
             session, query, mode, filters or {}, limit
@@ -714,13 +1204,25 @@ async def get_entity_history(entity_id: str) -> dict[str, Any]:
         Entity history with all temporal versions
     """
     async with async_session() as session:
-        # Get all versions of this entity
-        query = sa.select(Entity).where(
+        # Get all versions of this entity; only the reported columns are
+        # read, so meta_data JSON is never decoded and no ORM objects built
+        query = sa.select(
+            Entity.name,
+            Entity.entity_type,
+            Entity.description,
+            Entity.event_time,
+            Entity.ingestion_time,
+            Entity.valid_from,
+            Entity.valid_until,
+            Entity.confidence,
+            Entity.conversation_id,
+            Entity.message_id
+        ).where(
             Entity.id == entity_id
         ).order_by(Entity.valid_from)
 
         result = await session.execute(query)
-        versions = result.scalars().all()
+        versions = result.all()
 
         if not versions:
             return {"error": "Entity not found"}
@@ -9,12 +9,19 @@ from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 from uuid import uuid4
 
-from context_persistence.entity_extractor import EntityExtractor
+from context_persistence.entity_extractor import EntityExtractor, _load_pipeline
 
 
 class TestEntityExtractor:
     """Test suite for EntityExtractor class"""
 
+    @pytest.fixture(autouse=True)
+    def clear_pipeline_cache(self):
+        """Keep pipelines loaded under a patched spacy.load out of other tests"""
+        _load_pipeline.cache_clear()
+        yield
+        _load_pipeline.cache_clear()
+
     @pytest.fixture
     def mock_spacy_doc(self):
         """Create a mock spaCy document for testing"""
@@ -47,7 +54,27 @@ class TestEntityExtractor:
                 extractor = EntityExtractor()
                 
                 assert extractor.nlp == mock_nlp
-                mock_load.assert_called_once_with("en_core_web_sm")
+                mock_load.assert_called_once_with("en_core_web_sm", exclude=["lemmatizer"])
+
+        def test_init_without_concepts_loads_ner_only(self):
+            """Test the tagger and parser are skipped when concepts are off"""
+            with patch('spacy.load') as mock_load:
+                extractor = EntityExtractor(concepts=False)
+
+                assert extractor.nlp is mock_load.return_value
+                mock_load.assert_called_once_with(
+                    "en_core_web_sm",
+                    exclude=["lemmatizer", "tagger", "attribute_ruler", "parser"]
+                )
+
+        def test_pipeline_shared_between_extractors(self):
+            """Test the model is loaded once per process, not per extractor"""
+            with patch('spacy.load') as mock_load:
+                first = EntityExtractor()
+                second = EntityExtractor()
+
+                assert first.nlp is second.nlp
+                mock_load.assert_called_once()
 
         def test_init_without_spacy_model(self):
             """Test initialization when spaCy model is not available"""
@@ -119,6 +146,136 @@ class TestEntityExtractor:
             assert result[0]["ingestion_time"] == mock_now
             assert result[0]["message_id"] == 42
 
+        def test_extract_entities_batch(self, entity_extractor):
+            """Test batched extraction runs one spaCy pipe over all texts"""
+            mock_nlp = Mock()
+            docs = []
+            for text in ("Call load_data() first", "Then run UserController"):
+                doc = Mock()
+                doc.text = text
+                doc.ents = []
+                doc.noun_chunks = []
+                docs.append(doc)
+            mock_nlp.pipe.return_value = iter(docs)
+            entity_extractor.nlp = mock_nlp
+
+            result = entity_extractor.extract_entities_batch(
+                [("Call load_data() first", "conv-1", 1),
+                 ("Then run UserController", "conv-1", 2)]
+            )
+
+            mock_nlp.pipe.assert_called_once()
+            mock_nlp.assert_not_called()
+            assert [(e["name"], e["message_id"]) for e in result] == [
+                ("load_data", 1),
+                ("UserController", 2),
+            ]
+            assert len({e["id"] for e in result}) == 2
+
+        def test_extract_entities_batch_reuses_cached_texts(self, entity_extractor):
+            """Test texts seen before are not sent through spaCy again"""
+            def make_doc(text):
+                doc = Mock()
+                doc.text = text
+                doc.ents = []
+                doc.noun_chunks = []
+                return doc
+
+            piped = []
+
+            def pipe(texts, **kwargs):
+                texts = list(texts)
+                piped.append(texts)
+                return [make_doc(t) for t in texts]
+
+            mock_nlp = Mock(side_effect=make_doc)
+            mock_nlp.pipe.side_effect = pipe
+            entity_extractor.nlp = mock_nlp
+
+            first = entity_extractor.extract_entities_batch(
+                [("Call load_data() first", "conv-1", 1),
+                 ("Call load_data() first", "conv-1", 2)]
+            )
+            second = entity_extractor.extract_entities_batch(
+                [("Call load_data() first", "conv-2", 7),
+                 ("Then run UserController", "conv-2", 8),
+                 ("Open src/app.py", "conv-2", 9)]
+            )
+
+            # The lone new text of the first batch skips pipe
+            mock_nlp.assert_called_once_with("Call load_data() first")
+            assert piped == [["Then run UserController", "Open src/app.py"]]
+            assert [(e["name"], e["message_id"]) for e in first] == [
+                ("load_data", 1),
+                ("load_data", 2),
+            ]
+            assert [(e["name"], e["conversation_id"], e["message_id"]) for e in second] == [
+                ("load_data", "conv-2", 7),
+                ("UserController", "conv-2", 8),
+                ("src/app.py", "conv-2", 9),
+            ]
+            assert len({e["id"] for e in first + second}) == 5
+
+        def test_extract_entities_matches_batch(self, entity_extractor, mock_nlp):
+            """Test single-text extraction goes through the batched path"""
+            entity_extractor.nlp = mock_nlp
+            mock_nlp.return_value.text = "Call load_data() first"
+
+            with patch.object(
+                entity_extractor, "extract_entities_batch",
+                wraps=entity_extractor.extract_entities_batch
+            ) as batch:
+                result = entity_extractor.extract_entities(
+                    "Call load_data() first", "conv-1", message_id=3
+                )
+
+            batch.assert_called_once_with(
+                [("Call load_data() first", "conv-1", 3)], event_time=None
+            )
+            assert [(e["name"], e["message_id"]) for e in result] == [("load_data", 3)]
+
+        def test_extract_entities_without_concepts(self, mock_nlp):
+            """Test noun chunks are ignored when concepts are off"""
+            extractor = EntityExtractor(concepts=False)
+            extractor.nlp = mock_nlp
+            chunk = Mock(text="database server", start_char=0, end_char=15)
+            mock_nlp.return_value.noun_chunks = [chunk]
+
+            result = extractor.extract_entities("database server", "conv-1")
+
+            assert [e for e in result if e["entity_type"] == "concept"] == []
+
+        @pytest.mark.parametrize("n_process,n_texts,batch_size,expected", [
+            (1, 100, 10, 1),
+            (4, 100, 10, 4),
+            (4, 15, 10, 2),
+            (4, 3, 32, 1),
+        ])
+        def test_extract_entities_batch_caps_workers(
+            self, entity_extractor, n_process, n_texts, batch_size, expected
+        ):
+            """Test no more pipe workers are started than there are batches"""
+            mock_nlp = Mock()
+            mock_nlp.pipe.side_effect = lambda texts, **kwargs: [
+                Mock(text=t, ents=[], noun_chunks=[]) for t in texts
+            ]
+            entity_extractor.nlp = mock_nlp
+
+            entity_extractor.extract_entities_batch(
+                [(f"text {i}", "conv-1", i) for i in range(n_texts)],
+                batch_size=batch_size,
+                n_process=n_process
+            )
+
+            assert mock_nlp.pipe.call_args.kwargs["n_process"] == expected
+
+        def test_extract_entities_batch_empty(self, entity_extractor, mock_nlp):
+            """Test batched extraction with no input"""
+            entity_extractor.nlp = mock_nlp
+
+            assert entity_extractor.extract_entities_batch([]) == []
+            mock_nlp.pipe.assert_not_called()
+
     class TestEntityTypeMapping:
         """Test entity type mapping from spaCy labels"""
 
@@ -211,6 +368,23 @@ class TestEntityExtractor:
                 assert any("src/main.py" in e["name"] for e in file_entities)
                 assert any("tests/test_app.js" in e["name"] for e in file_entities)
 
+        @pytest.mark.parametrize("text,expected", [
+            ("edit src/app.pyc", {"src/app.py", "src/app.pyc"}),
+            ("restore src/foo.py.bak", {"src/foo.py", "src/foo.py.bak"}),
+            ("see mysrc/a.c", {"mysrc/a.c", "src/a.c"}),
+            ("run test/unit.sh", {"test/unit.sh"}),
+        ])
+        def test_extract_overlapping_file_paths(self, entity_extractor, text, expected):
+            """Test each file path pattern reports its own overlapping matches"""
+            mock_doc = Mock()
+            mock_doc.text = text
+
+            entities = entity_extractor._extract_code_entities(
+                mock_doc, "conv-123", 1, datetime(2023, 1, 1)
+            )
+
+            assert {e["name"] for e in entities if e["entity_type"] == "file"} == expected
+
         @patch('context_persistence.entity_extractor.datetime')
         def test_extract_function_calls(self, mock_datetime, entity_extractor):
             """Test extraction of function call entities"""
@@ -409,6 +583,14 @@ class TestEntityExtractor:
             # Should find all case variations
             assert len(mentions) == 3
 
+        def test_extract_entity_mentions_length_changing_case(self, entity_extractor):
+            """Test positions stay correct when lowercasing changes text length"""
+            text = "İstanbul uses the API"
+
+            mentions = entity_extractor.extract_entity_mentions(text, "api", "conv-1", 1)
+
+            assert [(m["mention_text"], m["position"]) for m in mentions] == [("API", 18)]
+
         def test_extract_entity_mentions_no_occurrences(self, entity_extractor):
             """Test extraction when entity is not found"""
             text = "This text contains no relevant terms"
@@ -431,6 +613,27 @@ class TestEntityExtractor:
             
             assert len(mentions) == 0
 
+        def test_extract_entity_mentions_empty_name(self, entity_extractor):
+            """Test extraction with an empty entity name"""
+            mentions = entity_extractor.extract_entity_mentions(
+                "Some text", "", "conv-123", 1
+            )
+
+            assert mentions == []
+
+        def test_extract_all_mentions(self, entity_extractor):
+            """Test finding several entities in one pass"""
+            text = "The API server calls the api and the Database"
+
+            mentions = entity_extractor.extract_all_mentions(
+                text, ["API", "API server", "database", "missing"], "conv-123", 1
+            )
+
+            assert [m["position"] for m in mentions["API server"]] == [4]
+            assert [m["mention_text"] for m in mentions["API"]] == ["api"]
+            assert [m["mention_text"] for m in mentions["database"]] == ["Database"]
+            assert mentions["missing"] == []
+
     class TestEntityDeduplication:
         """Test entity deduplication functionality"""
 
@@ -4,13 +4,21 @@ Comprehensive unit tests for HybridSearch component.
 Target: >80% code coverage for hybrid_search.py
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime
 from dataclasses import dataclass
 
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
 from context_persistence.hybrid_search import HybridSearch, SearchResult
-from context_persistence.models_enhanced import Entity, Relationship, Message
+from context_persistence.models_enhanced import (
+    Base, Entity, Relationship, Message, create_fts_tables
+)
 
 
 class TestSearchResult:
@@ -186,6 +194,87 @@ class TestHybridSearch:
             hybrid_search._graph_search.assert_called_once()
             hybrid_search._fuse_results.assert_called_once()
 
+        @pytest.mark.asyncio
+        async def test_search_strategies_run_concurrently(self, hybrid_search, mock_session):
+            """Test semantic search overlaps the session-bound searches"""
+            started = []
+
+            async def slow_search(name, *args):
+                started.append(name)
+                await asyncio.sleep(0.05)
+                return [SearchResult(name, "message", name, 0.9, name, {})]
+
+            hybrid_search._semantic_search = lambda *a: slow_search("semantic")
+            hybrid_search._keyword_search = lambda *a: slow_search("keyword")
+            hybrid_search._graph_search = lambda *a: slow_search("graph")
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await hybrid_search.search(
+                session=mock_session, query="API", mode="hybrid", min_score=0.0
+            )
+
+            # Keyword and graph share one session, so only semantic overlaps
+            assert loop.time() - start < 0.14
+            assert started[:2] == ["semantic", "keyword"]
+            assert {r["item_id"] for r in results} == {"semantic", "keyword", "graph"}
+
+        @pytest.mark.asyncio
+        async def test_search_session_factory_runs_in_parallel(self, hybrid_search, mock_session):
+            """Test keyword and graph searches get their own sessions when a factory is set"""
+            sessions = []
+
+            @asynccontextmanager
+            async def session_factory():
+                own_session = AsyncMock()
+                sessions.append(own_session)
+                yield own_session
+
+            async def search_with(session, *args):
+                await asyncio.sleep(0.05)
+                return [SearchResult(str(id(session)), "entity", "x", 0.9, "keyword", {})]
+
+            hybrid_search.session_factory = session_factory
+            hybrid_search._keyword_search = search_with
+            hybrid_search._graph_search = search_with
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await hybrid_search.search(
+                session=mock_session, query="API", mode="hybrid", min_score=0.0
+            )
+
+            assert loop.time() - start < 0.09
+            assert len(sessions) == 2
+            assert {r["item_id"] for r in results} == {str(id(s)) for s in sessions}
+
+        @pytest.mark.asyncio
+        @pytest.mark.parametrize("with_factory", [False, True])
+        async def test_search_survives_failed_strategies(
+            self, hybrid_search, mock_session, with_factory, capsys
+        ):
+            """Test a failing strategy is reported and the others are still fused"""
+            if with_factory:
+                @asynccontextmanager
+                async def session_factory():
+                    yield AsyncMock()
+                hybrid_search.session_factory = session_factory
+
+            hybrid_search._semantic_search = AsyncMock(side_effect=RuntimeError("qdrant down"))
+            hybrid_search._keyword_search = AsyncMock(side_effect=RuntimeError("bad match"))
+            hybrid_search._graph_search = AsyncMock(return_value=[
+                SearchResult("entity1", "entity", "API entity", 0.6, "graph", {})
+            ])
+
+            results = await hybrid_search.search(
+                session=mock_session, query="API", mode="hybrid", min_score=0.0
+            )
+
+            assert [r["item_id"] for r in results] == ["entity1"]
+            output = capsys.readouterr().out
+            assert "Semantic search failed: qdrant down" in output
+            assert "Keyword search failed: bad match" in output
+
         @pytest.mark.asyncio
         async def test_search_semantic_mode_only(self, hybrid_search, mock_session):
             """Test semantic-only search mode"""
@@ -331,7 +420,7 @@ class TestHybridSearch:
                 "timestamp": "2023-01-01T12:00:00"
             }
             
-            hybrid_search.qdrant.search.return_value = [mock_result]
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[mock_result])
             
             results = await hybrid_search._semantic_search(
                 query="API design",
@@ -347,8 +436,10 @@ class TestHybridSearch:
             assert results[0].content == "API design discussion"
             
             # Check that embedding model was called
-            hybrid_search.embedding_model.encode.assert_called_once_with("API design")
-            hybrid_search.qdrant.search.assert_called_once()
+            hybrid_search.embedding_model.encode.assert_called_once_with(
+                "API design", normalize_embeddings=True
+            )
+            hybrid_search.qdrant.query_points.assert_called_once()
 
         @pytest.mark.asyncio
         async def test_semantic_search_with_filters(self, hybrid_search):
@@ -361,7 +452,7 @@ class TestHybridSearch:
                 "conversation_id": "conv1"
             }
             
-            hybrid_search.qdrant.search.return_value = [mock_result]
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[mock_result])
             
             filters = {"conversation_id": "conv1"}
             results = await hybrid_search._semantic_search(
@@ -390,20 +481,20 @@ class TestHybridSearch:
             # Test with numpy array
             import numpy as np
             hybrid_search.embedding_model.encode.return_value = np.array([0.1, 0.2, 0.3])
-            hybrid_search.qdrant.search.return_value = []
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[])
             
             await hybrid_search._semantic_search("test", {}, 10, 0.5)
             
             # Should convert numpy array to list
-            call_args = hybrid_search.qdrant.search.call_args[1]
-            query_vector = call_args["query_vector"]
+            call_args = hybrid_search.qdrant.query_points.call_args[1]
+            query_vector = call_args["query"]
             assert isinstance(query_vector, list)
             assert query_vector == [0.1, 0.2, 0.3]
 
         @pytest.mark.asyncio
         async def test_semantic_search_error_handling(self, hybrid_search):
             """Test semantic search error handling"""
-            hybrid_search.qdrant.search.side_effect = Exception("Qdrant error")
+            hybrid_search.qdrant.query_points.side_effect = Exception("Qdrant error")
             
             results = await hybrid_search._semantic_search(
                 query="test",
@@ -414,6 +505,22 @@ class TestHybridSearch:
             
             assert results == []
 
+        @pytest.mark.asyncio
+        async def test_semantic_search_holds_qdrant_lock(self, hybrid_search):
+            """Test Qdrant is only queried while the client lock is held"""
+            import threading
+            lock = threading.Lock()
+            hybrid_search.qdrant_lock = lock
+            hybrid_search.qdrant.query_points.side_effect = (
+                lambda **kwargs: Mock(points=[]) if lock.locked() else None
+            )
+
+            results = await hybrid_search._semantic_search("test", {}, 10, 0.5)
+
+            assert results == []
+            hybrid_search.qdrant.query_points.assert_called_once()
+            assert not lock.locked()
+
         @pytest.mark.asyncio
         async def test_semantic_search_with_limit(self, hybrid_search):
             """Test semantic search respects limit"""
@@ -426,7 +533,7 @@ class TestHybridSearch:
                 mock_result.payload = {"content": f"content{i}", "conversation_id": "conv1"}
                 mock_results.append(mock_result)
             
-            hybrid_search.qdrant.search.return_value = mock_results
+            hybrid_search.qdrant.query_points.return_value = Mock(points=mock_results)
             
             results = await hybrid_search._semantic_search(
                 query="test",
@@ -437,43 +544,218 @@ class TestHybridSearch:
             
             assert len(results) == 10
 
+        @pytest.mark.asyncio
+        async def test_query_embedding_cached(self, hybrid_search):
+            """Test repeated queries reuse the cached embedding"""
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[])
+            
+            await hybrid_search._semantic_search("API design", {}, 10, 0.5)
+            await hybrid_search._semantic_search("API design", {}, 10, 0.5)
+            
+            hybrid_search.embedding_model.encode.assert_called_once()
+            assert hybrid_search.qdrant.query_points.call_count == 2
+
+        @pytest.mark.asyncio
+        async def test_concurrent_queries_batched(self, hybrid_search):
+            """Test concurrent cache misses are encoded in one model call"""
+            import numpy as np
+            hybrid_search.embedding_model.encode.return_value = np.array([
+                [1.0, 0.0], [0.0, 1.0]
+            ])
+            
+            first, second, again = await asyncio.gather(
+                hybrid_search._embed_query("first"),
+                hybrid_search._embed_query("second"),
+                hybrid_search._embed_query("first")
+            )
+            
+            assert first == again == [1.0, 0.0]
+            assert second == [0.0, 1.0]
+            hybrid_search.embedding_model.encode.assert_called_once_with(
+                ["first", "second"], batch_size=2, normalize_embeddings=True
+            )
+
+        @pytest.mark.asyncio
+        async def test_query_embedding_error_propagates(self, hybrid_search):
+            """Test encode failures reach every waiting query"""
+            hybrid_search.embedding_model.encode.side_effect = RuntimeError("model error")
+            
+            with pytest.raises(RuntimeError):
+                await hybrid_search._embed_query("test")
+            assert hybrid_search._pending_queries == []
+
+        @pytest.mark.asyncio
+        async def test_semantic_search_in_memory(self, hybrid_search):
+            """Test small collections are searched from the in-memory matrix"""
+            records = []
+            for point_id, vector, conv in (
+                ("p1", [1.0, 0.0], "conv1"),
+                ("p2", [0.6, 0.8], "conv1"),
+                ("p3", [0.0, 2.0], "conv2"),
+            ):
+                record = Mock()
+                record.id = point_id
+                record.vector = vector
+                record.payload = {"conversation_id": conv, "content": point_id}
+                records.append(record)
+            hybrid_search.memory_search_limit = 100
+            hybrid_search.qdrant.count.return_value = Mock(count=3)
+            hybrid_search.qdrant.scroll.return_value = (records, None)
+            hybrid_search.embedding_model.encode.return_value = [1.0, 0.0]
+            
+            results = await hybrid_search._semantic_search("test", {}, 10, 0.5)
+            
+            assert [r.item_id for r in results] == ["p1", "p2"]
+            assert results[0].score == pytest.approx(1.0)
+            assert results[1].score == pytest.approx(0.6)
+            hybrid_search.qdrant.query_points.assert_not_called()
+            
+            # Loaded once until invalidated
+            await hybrid_search._semantic_search("other", {}, 1, 0.0)
+            assert hybrid_search.qdrant.scroll.call_count == 1
+            hybrid_search.invalidate_vectors()
+            await hybrid_search._semantic_search("other", {}, 1, 0.0)
+            assert hybrid_search.qdrant.scroll.call_count == 2
+
+        @pytest.mark.asyncio
+        async def test_semantic_search_discards_overtaken_load(self, hybrid_search):
+            """Test a load raced by an invalidation is not published"""
+            record = Mock()
+            record.id = "p1"
+            record.vector = [1.0, 0.0]
+            record.payload = {"conversation_id": "conv1"}
+
+            def scroll(**kwargs):
+                if hybrid_search.qdrant.scroll.call_count == 1:
+                    hybrid_search.invalidate_vectors()  # a save lands mid-load
+                return [record], None
+
+            hybrid_search.memory_search_limit = 100
+            hybrid_search.qdrant.count.return_value = Mock(count=1)
+            hybrid_search.qdrant.scroll.side_effect = scroll
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[])
+            hybrid_search.embedding_model.encode.return_value = [1.0, 0.0]
+
+            results = await hybrid_search._semantic_search("test", {}, 10, 0.5)
+
+            assert results == []
+            assert hybrid_search._vectors is None
+            hybrid_search.qdrant.query_points.assert_called_once()
+
+            results = await hybrid_search._semantic_search("test", {}, 10, 0.5)
+
+            assert [r.item_id for r in results] == ["p1"]
+            assert hybrid_search.qdrant.scroll.call_count == 2
+
+        @pytest.mark.asyncio
+        @pytest.mark.parametrize("dtype", ["float16", "int8"])
+        async def test_semantic_search_in_memory_reduced_precision(self, hybrid_search, dtype):
+            """Test float16/int8 vector storage scores close to float32"""
+            records = []
+            for point_id, vector in (("p1", [1.0, 0.0]), ("p2", [0.6, 0.8]), ("p3", [0.0, 0.0])):
+                record = Mock()
+                record.id = point_id
+                record.vector = vector
+                record.payload = {"conversation_id": "conv1"}
+                records.append(record)
+            hybrid_search.memory_search_limit = 100
+            hybrid_search.memory_search_dtype = dtype
+            hybrid_search.qdrant.count.return_value = Mock(count=3)
+            hybrid_search.qdrant.scroll.return_value = (records, None)
+            hybrid_search.embedding_model.encode.return_value = [0.6, 0.8]
+
+            results = await hybrid_search._semantic_search("test", {}, 10, 0.5)
+
+            assert hybrid_search._vectors[2].dtype == dtype
+            assert [r.item_id for r in results] == ["p2", "p1"]
+            assert results[0].score == pytest.approx(1.0, abs=0.01)
+            assert results[1].score == pytest.approx(0.6, abs=0.01)
+
+        def test_invalid_memory_search_dtype(self):
+            """Test unsupported vector storage types are rejected"""
+            with pytest.raises(ValueError):
+                HybridSearch(Mock(), Mock(), Mock(), memory_search_dtype="float64")
+
+        @pytest.mark.asyncio
+        async def test_semantic_search_large_collection_uses_qdrant(self, hybrid_search):
+            """Test collections over the memory limit are queried in Qdrant"""
+            hybrid_search.memory_search_limit = 10
+            hybrid_search.qdrant.count.return_value = Mock(count=11)
+            hybrid_search.qdrant.query_points.return_value = Mock(points=[])
+            
+            await hybrid_search._semantic_search("test", {}, 10, 0.5)
+            
+            hybrid_search.qdrant.scroll.assert_not_called()
+            hybrid_search.qdrant.query_points.assert_called_once()
+
+        @pytest.mark.asyncio
+        async def test_load_message_content(self, hybrid_search, mock_session):
+            """Test semantic results without payload content are filled from SQLite"""
+            results = [
+                SearchResult("point1", "message", "", 0.9, "semantic", {}),
+                SearchResult("point2", "message", "cached", 0.8, "semantic", {})
+            ]
+            mock_result = Mock()
+            mock_result.all.return_value = [("point1", "API design discussion")]
+            mock_session.execute.return_value = mock_result
+
+            await hybrid_search._load_message_content(mock_session, results)
+
+            assert results[0].content == "API design discussion"
+            assert results[1].content == "cached"
+            mock_session.execute.assert_called_once()
+
+        @pytest.mark.asyncio
+        async def test_load_message_content_skips_query(self, hybrid_search, mock_session):
+            """Test no query is issued when every result has content"""
+            results = [SearchResult("point1", "message", "text", 0.9, "semantic", {})]
+
+            await hybrid_search._load_message_content(mock_session, results)
+
+            mock_session.execute.assert_not_called()
+
     class TestKeywordSearch:
         """Test keyword search functionality"""
 
+        @pytest.fixture
+        async def db_session(self, sample_messages, sample_entities):
+            """In-memory SQLite database with FTS5 indexes and sample rows"""
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(create_fts_tables)
+
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            async with session_factory() as session:
+                session.add_all(sample_messages + sample_entities)
+                await session.commit()
+                yield session
+
+            await engine.dispose()
+
         @pytest.mark.asyncio
-        async def test_keyword_search_messages(self, hybrid_search, mock_session, sample_messages):
+        async def test_keyword_search_messages(self, hybrid_search, db_session):
             """Test keyword search in messages"""
-            # Mock database query
-            mock_result = AsyncMock()
-            mock_result.scalars.return_value.all.return_value = sample_messages
-            mock_session.execute.return_value = mock_result
-            
             results = await hybrid_search._keyword_search(
-                session=mock_session,
+                session=db_session,
                 query="API",
                 filters={},
                 limit=10
             )
             
-            assert len(results) == 2
-            assert all(r.item_type == "message" for r in results)
+            message_results = [r for r in results if r.item_type == "message"]
+            assert len(message_results) == 1
             assert all(r.source == "keyword" for r in results)
-            
-            # Check score calculation based on term frequency
-            api_results = [r for r in results if "API" in r.content]
-            assert len(api_results) == 1
-            assert api_results[0].score > 0
+            assert "API" in message_results[0].content
+            assert message_results[0].item_id == "1"
+            assert 0 <= message_results[0].score < 1.0
+            assert message_results[0].metadata["timestamp"] == "2023-01-01T00:00:00"
 
         @pytest.mark.asyncio
-        async def test_keyword_search_entities(self, hybrid_search, mock_session, sample_entities):
+        async def test_keyword_search_entities(self, hybrid_search, db_session):
             """Test keyword search in entities"""
-            # Mock entity query
-            mock_result = AsyncMock()
-            mock_result.scalars.return_value.all.return_value = sample_entities
-            mock_session.execute.return_value = mock_result
-            
             results = await hybrid_search._keyword_search(
-                session=mock_session,
+                session=db_session,
                 query="API",
                 filters={},
                 limit=10
@@ -481,73 +763,154 @@ class TestHybridSearch:
             
             entity_results = [r for r in results if r.item_type == "entity"]
             assert len(entity_results) == 1  # Only "API" entity should match
-            assert entity_results[0].score == 0.9  # Name match gets higher score
+            assert entity_results[0].item_id == "entity1"
+            assert 0 <= entity_results[0].score < 1.0
 
         @pytest.mark.asyncio
-        async def test_keyword_search_with_conversation_filter(self, hybrid_search, mock_session, sample_messages):
-            """Test keyword search with conversation filter"""
-            mock_result = AsyncMock()
-            mock_result.scalars.return_value.all.return_value = sample_messages
-            mock_session.execute.return_value = mock_result
+        async def test_keyword_search_description_match(self, hybrid_search, db_session):
+            """Test entities are found through their description"""
+            results = await hybrid_search._keyword_search(
+                session=db_session,
+                query="storage",
+                filters={},
+                limit=10
+            )
             
-            filters = {"conversation_id": "conv1"}
+            assert [r.item_id for r in results] == ["entity2"]
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_stemming(self, hybrid_search, db_session):
+            """Test the porter tokenizer matches word variants"""
             results = await hybrid_search._keyword_search(
-                session=mock_session,
-                query="test",
-                filters=filters,
+                session=db_session,
+                query="messages",
+                filters={},
                 limit=10
             )
             
-            # Should apply filter to message query
-            message_results = [r for r in results if r.item_type == "message"]
-            assert len(message_results) == 2
+            assert {r.item_id for r in results} == {"1", "2"}
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_with_conversation_filter(self, hybrid_search, db_session):
+            """Test keyword search with conversation filter"""
+            results = await hybrid_search._keyword_search(
+                session=db_session,
+                query="message",
+                filters={"conversation_id": "conv1"},
+                limit=10
+            )
+            assert len([r for r in results if r.item_type == "message"]) == 2
+
+            results = await hybrid_search._keyword_search(
+                session=db_session,
+                query="message",
+                filters={"conversation_id": "conv2"},
+                limit=10
+            )
+            assert [r for r in results if r.item_type == "message"] == []
 
         @pytest.mark.asyncio
-        async def test_keyword_search_with_entity_type_filter(self, hybrid_search, mock_session, sample_entities):
+        async def test_keyword_search_with_entity_type_filter(self, hybrid_search, db_session):
             """Test keyword search with entity type filter"""
-            mock_result = AsyncMock()
-            mock_result.scalars.return_value.all.return_value = sample_entities
-            mock_session.execute.return_value = mock_result
-            
-            filters = {"entity_type": "concept"}
             results = await hybrid_search._keyword_search(
-                session=mock_session,
-                query="test",
-                filters=filters,
+                session=db_session,
+                query="API",
+                filters={"entity_type": "concept"},
                 limit=10
             )
-            
             entity_results = [r for r in results if r.item_type == "entity"]
-            assert len(entity_results) == 2  # Both entities are "concept" type
+            assert [r.item_id for r in entity_results] == ["entity1"]
+
+            results = await hybrid_search._keyword_search(
+                session=db_session,
+                query="API",
+                filters={"entity_type": "tool"},
+                limit=10
+            )
+            assert [r for r in results if r.item_type == "entity"] == []
 
         @pytest.mark.asyncio
-        async def test_keyword_search_score_calculation(self, hybrid_search, mock_session):
-            """Test keyword search score calculation"""
-            # Create message with multiple query occurrences
-            message = Message(
-                id=1,
+        async def test_keyword_search_score_calculation(self, hybrid_search, db_session):
+            """Test BM25 scores use a fixed 0-1 scale and rank denser matches first"""
+            db_session.add(Message(
+                id=3,
                 conversation_id="conv1",
                 content="API API API design",
                 role="user",
-                timestamp=datetime(2023, 1, 1),
+                timestamp=datetime(2023, 1, 3),
                 tokens=10
+            ))
+            # Unrelated rows give "API" a meaningful inverse document frequency
+            db_session.add_all(
+                Message(conversation_id="conv1", content=f"Note {i} on caching", role="user")
+                for i in range(20)
             )
-            
-            mock_result = AsyncMock()
-            mock_result.scalars.return_value.all.return_value = [message]
-            mock_session.execute.return_value = mock_result
+            await db_session.commit()
             
             results = await hybrid_search._keyword_search(
-                session=mock_session,
+                session=db_session,
                 query="API",
                 filters={},
                 limit=10
             )
             
-            # Score should be based on term frequency
-            assert len(results) == 1
-            assert results[0].score > 0  # Should have positive score
-            assert results[0].score <= 1.0  # Should be normalized
+            message_results = [r for r in results if r.item_type == "message"]
+            assert [r.item_id for r in message_results] == ["3", "1"]
+            assert 0.5 < message_results[1].score < message_results[0].score < 1.0
+
+            # The best hit is not rescaled to 1.0 when it matches weakly
+            results = await hybrid_search._keyword_search(db_session, "caching", {}, 10)
+            assert results and all(r.score < 0.5 for r in results)
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_requires_every_term(self, hybrid_search, db_session):
+            """Test terms are AND-ed like the substring match they replaced"""
+            results = await hybrid_search._keyword_search(db_session, "API design", {}, 10)
+            assert [r.item_id for r in results] == ["1"]
+
+            results = await hybrid_search._keyword_search(db_session, "API storage", {}, 10)
+            assert results == []
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_ignores_operator_words(self, hybrid_search, db_session):
+            """Test FTS operator words and bare punctuation are not search terms"""
+            db_session.add(Message(
+                id=3, conversation_id="conv1", content="This and that", role="user"
+            ))
+            await db_session.commit()
+
+            assert await hybrid_search._keyword_search(db_session, '"weird" AND (', {}, 10) == []
+            assert await hybrid_search._keyword_search(db_session, "and OR ( )", {}, 10) == []
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_escapes_fts_syntax(self, hybrid_search, db_session):
+            """Test FTS5 operators and quotes in the query are matched literally"""
+            for query in ('API"', "NOT AND", "design*", "(API"):
+                results = await hybrid_search._keyword_search(
+                    session=db_session,
+                    query=query,
+                    filters={},
+                    limit=10
+                )
+                assert isinstance(results, list)
+
+            assert await hybrid_search._keyword_search(db_session, "   ", {}, 10) == []
+
+        @pytest.mark.asyncio
+        async def test_keyword_search_tracks_updates(self, hybrid_search, db_session):
+            """Test triggers keep the index in sync with edits and deletes"""
+            message = await db_session.get(Message, 1)
+            message.content = "Rewritten text about caching"
+            await db_session.commit()
+            
+            results = await hybrid_search._keyword_search(db_session, "caching", {}, 10)
+            assert [r.item_id for r in results] == ["1"]
+            results = await hybrid_search._keyword_search(db_session, "API", {}, 10)
+            assert [r for r in results if r.item_type == "message"] == []
+            
+            await db_session.delete(message)
+            await db_session.commit()
+            assert await hybrid_search._keyword_search(db_session, "caching", {}, 10) == []
 
     class TestGraphSearch:
         """Test graph search functionality"""
@@ -8,9 +8,22 @@ import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
 import networkx as nx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
 from context_persistence.knowledge_graph import KnowledgeGraph
-from context_persistence.models_enhanced import Entity, Relationship
+from context_persistence.models_enhanced import Base, Entity, Relationship
+
+
+def stream_result(*batches):
+    """Mock an AsyncResult whose partitions() yields the given row batches"""
+    async def partitions(size=None):
+        for rows in batches:
+            yield rows
+
+    result = Mock()
+    result.partitions = partitions
+    return result
 
 
 class TestKnowledgeGraph:
@@ -137,7 +150,7 @@ class TestKnowledgeGraph:
         async def test_build_graph_empty_database(self, knowledge_graph, mock_session):
             """Test building graph from empty database"""
             # Mock empty results
-            mock_session.execute.return_value.scalars.return_value.all.side_effect = [[], []]
+            mock_session.stream.side_effect = [stream_result(), stream_result()]
             
             node_count = await knowledge_graph.build_graph(mock_session)
             
@@ -149,9 +162,9 @@ class TestKnowledgeGraph:
         @pytest.mark.asyncio
         async def test_build_graph_with_entities(self, knowledge_graph, mock_session, sample_entities):
             """Test building graph with entities only"""
-            mock_session.execute.return_value.scalars.return_value.all.side_effect = [
-                sample_entities,  # entities
-                []  # relationships
+            mock_session.stream.side_effect = [
+                stream_result(sample_entities),  # entities
+                stream_result()  # relationships
             ]
             
             node_count = await knowledge_graph.build_graph(mock_session)
@@ -171,9 +184,9 @@ class TestKnowledgeGraph:
         @pytest.mark.asyncio
         async def test_build_graph_with_relationships(self, knowledge_graph, mock_session, sample_entities, sample_relationships):
             """Test building graph with entities and relationships"""
-            mock_session.execute.return_value.scalars.return_value.all.side_effect = [
-                sample_entities,  # entities
-                sample_relationships  # relationships
+            mock_session.stream.side_effect = [
+                stream_result(sample_entities),  # entities
+                stream_result(sample_relationships)  # relationships
             ]
             
             node_count = await knowledge_graph.build_graph(mock_session)
@@ -197,12 +210,12 @@ class TestKnowledgeGraph:
             
             # Mock query filters
             with patch('sqlalchemy.select') as mock_select:
-                mock_session.execute.return_value.scalars.return_value.all.side_effect = [[], []]
+                mock_session.stream.side_effect = [stream_result(), stream_result()]
                 
                 await knowledge_graph.build_graph(mock_session, as_of=as_of_time)
                 
                 # Should have called queries with time filters
-                assert mock_session.execute.call_count == 2
+                assert mock_session.stream.call_count == 2
 
         @pytest.mark.asyncio
         async def test_build_graph_clears_existing(self, knowledge_graph, mock_session, sample_entities):
@@ -211,9 +224,9 @@ class TestKnowledgeGraph:
             knowledge_graph.graph.add_node("old_node")
             knowledge_graph.graph.add_edge("old_node", "old_node2")
             
-            mock_session.execute.return_value.scalars.return_value.all.side_effect = [
-                sample_entities,  # entities
-                []  # relationships
+            mock_session.stream.side_effect = [
+                stream_result(sample_entities),  # entities
+                stream_result()  # relationships
             ]
             
             await knowledge_graph.build_graph(mock_session)
@@ -229,13 +242,125 @@ class TestKnowledgeGraph:
             initial_time = knowledge_graph._last_refresh
             assert initial_time is None
             
-            mock_session.execute.return_value.scalars.return_value.all.side_effect = [[], []]
+            mock_session.stream.side_effect = [stream_result(), stream_result()]
             
             await knowledge_graph.build_graph(mock_session)
             
             assert knowledge_graph._last_refresh is not None
             assert isinstance(knowledge_graph._last_refresh, datetime)
 
+    class TestIncrementalRefresh:
+        """Test applying database changes without a full rebuild"""
+
+        @pytest.fixture
+        async def db_session(self, sample_entities, sample_relationships):
+            """In-memory SQLite database holding the sample graph"""
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            async with session_factory() as session:
+                session.add_all(sample_entities + sample_relationships)
+                await session.commit()
+                yield session
+
+            await engine.dispose()
+
+        @pytest.mark.asyncio
+        async def test_refresh_without_load_builds_graph(self, knowledge_graph, db_session):
+            """Test refresh falls back to a full build"""
+            node_count = await knowledge_graph.refresh(db_session)
+
+            assert node_count == 3
+            assert knowledge_graph.graph.number_of_edges() == 2
+
+        @pytest.mark.asyncio
+        async def test_refresh_applies_changes(self, knowledge_graph, db_session):
+            """Test new, updated and invalidated rows are applied as deltas"""
+            await knowledge_graph.build_graph(db_session)
+            now = datetime.utcnow()
+
+            db_session.add(Entity(
+                id="entity4", name="New Tool", entity_type="tool",
+                event_time=now, ingestion_time=now, valid_from=now
+            ))
+            db_session.add(Relationship(
+                id="rel3", source_entity_id="entity3", target_entity_id="entity4",
+                relationship_type="uses", event_time=now, ingestion_time=now, valid_from=now
+            ))
+            rel1 = await db_session.get(Relationship, "rel1")
+            rel1.valid_until = now
+            entity2 = await db_session.get(Entity, "entity2")
+            entity2.valid_until = now
+            await db_session.commit()
+
+            node_count = await knowledge_graph.refresh(db_session)
+
+            assert node_count == 3
+            assert "entity2" not in knowledge_graph.graph
+            assert knowledge_graph.graph.nodes["entity4"]["name"] == "New Tool"
+            assert knowledge_graph.graph.has_edge("entity3", "entity4", key="rel3")
+            assert not knowledge_graph.graph.has_edge("entity1", "entity2")
+
+        @pytest.mark.asyncio
+        async def test_refresh_after_past_build_rebuilds(self, knowledge_graph, db_session):
+            """Test a graph built for a past time is rebuilt for the present"""
+            await knowledge_graph.build_graph(db_session, as_of=datetime(2023, 1, 1, 12))
+            assert knowledge_graph.graph.number_of_nodes() == 1
+
+            node_count = await knowledge_graph.refresh(db_session)
+
+            assert node_count == 3
+
+        @pytest.mark.asyncio
+        async def test_ensure_current_skips_unchanged_database(self, knowledge_graph, db_session):
+            """Test loading is skipped until the database changes"""
+            assert await knowledge_graph.ensure_current(db_session) == 3
+
+            with patch.object(knowledge_graph, "refresh", wraps=knowledge_graph.refresh) as refresh:
+                assert await knowledge_graph.ensure_current(db_session) == 3
+                refresh.assert_not_called()
+
+                entity2 = await db_session.get(Entity, "entity2")
+                entity2.valid_until = datetime.utcnow()
+                await db_session.commit()
+
+                assert await knowledge_graph.ensure_current(db_session) == 2
+                refresh.assert_called_once()
+
+        @pytest.mark.asyncio
+        async def test_add_written_rows_in_place(self, knowledge_graph, db_session):
+            """Test just-written rows are patched into a loaded graph"""
+            assert not knowledge_graph.is_current
+            await knowledge_graph.build_graph(db_session)
+            assert knowledge_graph.is_current
+            now = datetime.utcnow()
+
+            entity = dict(
+                id="entity4", name="New Tool", entity_type="tool",
+                event_time=now, ingestion_time=now, valid_from=now
+            )
+            relationship = dict(
+                id="rel3", source_entity_id="entity3", target_entity_id="entity4",
+                relationship_type="uses", event_time=now, ingestion_time=now, valid_from=now
+            )
+            db_session.add_all([Entity(**entity), Relationship(**relationship)])
+            await db_session.commit()
+
+            knowledge_graph.add_entity_node(entity)
+            knowledge_graph.add_relationship_edge(relationship)
+
+            assert knowledge_graph.graph.nodes["entity4"]["confidence"] == 1.0
+            edge = knowledge_graph.graph.edges["entity3", "entity4", "rel3"]
+            assert edge["relationship_type"] == "uses"
+            assert edge["properties"] == {}
+
+            # The in-place result matches what a full load produces
+            patched = nx.to_dict_of_dicts(knowledge_graph.graph)
+            await knowledge_graph.build_graph(db_session)
+            assert nx.to_dict_of_dicts(knowledge_graph.graph) == patched
+
     class TestPathFinding:
         """Test path finding algorithms"""
 
@@ -303,6 +428,16 @@ class TestKnowledgeGraph:
             
             assert paths == []  # Path too long for max depth
 
+        def test_find_paths_parallel_edges(self, knowledge_graph):
+            """Test that parallel edges do not duplicate paths"""
+            knowledge_graph.graph.add_edge("A", "B", key="edge1")
+            knowledge_graph.graph.add_edge("A", "B", key="edge2")
+            knowledge_graph.graph.add_edge("B", "C")
+
+            paths = knowledge_graph.find_paths("A", "C", max_depth=3)
+
+            assert paths == [["A", "B", "C"]]
+
         def test_find_shortest_path(self, knowledge_graph):
             """Test finding shortest path"""
             # Create a simple path
@@ -411,6 +546,24 @@ class TestKnowledgeGraph:
             assert "D" in neighbor_ids
             assert "C" not in neighbor_ids
 
+        def test_get_neighbors_summary_fields(self, knowledge_graph):
+            """Test that neighbors carry summary fields only"""
+            knowledge_graph.graph.add_node("A", name="A", entity_type="test")
+            knowledge_graph.graph.add_node(
+                "B", name="B", entity_type="test", confidence=0.8, meta_data={"large": "blob"}
+            )
+            knowledge_graph.graph.add_edge("A", "B")
+
+            neighbors = knowledge_graph.get_neighbors("A", depth=1)
+
+            assert neighbors["depth_1"] == [{
+                "id": "B",
+                "name": "B",
+                "entity_type": "test",
+                "description": None,
+                "confidence": 0.8
+            }]
+
         def test_get_neighbors_nonexistent_node(self, knowledge_graph):
             """Test neighbor retrieval for nonexistent node"""
             neighbors = knowledge_graph.get_neighbors("nonexistent")
@@ -572,6 +725,19 @@ class TestKnowledgeGraph:
             assert project_entities[0]["id"] == "entity2"  # Higher confidence
             assert project_entities[1]["id"] == "entity4"  # Lower confidence
 
+        def test_find_related_entities_follows_incoming_edges(self, knowledge_graph):
+            """Test that related entities ignore edge direction"""
+            knowledge_graph.graph.add_node("entity1", name="Entity1", entity_type="person")
+            knowledge_graph.graph.add_node("entity2", name="Entity2", entity_type="project")
+            knowledge_graph.graph.add_node("entity3", name="Entity3", entity_type="tool")
+
+            knowledge_graph.graph.add_edge("entity2", "entity1")
+            knowledge_graph.graph.add_edge("entity3", "entity2")
+
+            related = knowledge_graph.find_related_entities("entity1", max_distance=2)
+
+            assert [(r["id"], r["distance"]) for r in related] == [("entity2", 1), ("entity3", 2)]
+
         def test_find_related_entities_nonexistent(self, knowledge_graph):
             """Test finding related entities for nonexistent entity"""
             related = knowledge_graph.find_related_entities("nonexistent")
@@ -676,6 +842,87 @@ class TestKnowledgeGraph:
             # Hub should be first (highest centrality)
             assert score_items[0][0] == "hub"
 
+        def test_get_centrality_scores_match_networkx(self, knowledge_graph):
+            """Test that centrality scores match nx.pagerank"""
+            knowledge_graph.graph.add_edge("A", "B")
+            knowledge_graph.graph.add_edge("A", "B")  # Parallel edge
+            knowledge_graph.graph.add_edge("B", "C")
+            knowledge_graph.graph.add_edge("C", "A")
+            knowledge_graph.graph.add_edge("C", "D")
+            knowledge_graph.graph.add_node("isolated")
+
+            expected = nx.pagerank(knowledge_graph.graph)
+            scores = knowledge_graph.get_centrality_scores(limit=10)
+
+            assert set(scores) == set(expected)
+            for node_id, score in expected.items():
+                assert scores[node_id] == pytest.approx(score, abs=1e-6)
+
+        def test_get_centrality_scores_reuses_pagerank(self, knowledge_graph):
+            """Test PageRank only reruns after the graph changes"""
+            knowledge_graph.graph.add_edge("A", "B")
+            knowledge_graph.graph.add_edge("B", "C")
+
+            with patch.object(knowledge_graph, "_pagerank", wraps=knowledge_graph._pagerank) as pagerank:
+                first = knowledge_graph.get_centrality_scores(limit=1)
+                second = knowledge_graph.get_centrality_scores(limit=3)
+                assert pagerank.call_count == 1
+
+                knowledge_graph.graph.add_edge("C", "D")
+                third = knowledge_graph.get_centrality_scores(limit=4)
+                assert pagerank.call_count == 2
+
+            assert list(first) == list(second)[:1]
+            assert len(third) == 4
+
+        def test_get_centrality_scores_same_size_edit(self, knowledge_graph):
+            """Test PageRank reruns after invalidate() even if the counts are unchanged"""
+            knowledge_graph.graph.add_edge("A", "B")
+            knowledge_graph.graph.add_node("C")
+            scores = knowledge_graph.get_centrality_scores()
+            assert max(scores, key=scores.get) == "B"
+
+            knowledge_graph.graph.remove_edge("A", "B")
+            knowledge_graph.graph.add_edge("A", "C")
+            knowledge_graph.invalidate()
+            scores = knowledge_graph.get_centrality_scores()
+
+            assert max(scores, key=scores.get) == "C"
+
+        def test_edge_arrays_reused_until_graph_changes(self, knowledge_graph):
+            """Test the array form is only rebuilt after the graph changes"""
+            knowledge_graph.graph.add_edge("A", "B")
+            arrays = knowledge_graph._edge_arrays()
+
+            assert knowledge_graph._edge_arrays() is arrays
+
+            knowledge_graph.add_relationship_edge({
+                "id": "rel1", "source_entity_id": "B", "target_entity_id": "A",
+                "relationship_type": "uses"
+            })
+            rebuilt = knowledge_graph._edge_arrays()
+
+            assert rebuilt is not arrays
+            assert len(rebuilt[1]) == 2
+
+        def test_edge_arrays_follow_direct_edits(self, knowledge_graph):
+            """Test edits to .graph itself rebuild the arrays"""
+            knowledge_graph.graph.add_edge("A", "B")
+            knowledge_graph._edge_arrays()
+
+            knowledge_graph.graph.add_edge("B", "C")
+            assert len(knowledge_graph._edge_arrays()[1]) == 2
+
+            knowledge_graph.graph.remove_edge("B", "C")
+            assert len(knowledge_graph._edge_arrays()[1]) == 1
+
+            # Same node and edge counts: only invalidate() can tell
+            knowledge_graph.graph.remove_edge("A", "B")
+            knowledge_graph.graph.add_edge("B", "A")
+            knowledge_graph.invalidate()
+            nodes, src, dst = knowledge_graph._edge_arrays()[:3]
+            assert (nodes[src[0]], nodes[dst[0]]) == ("B", "A")
+
     class TestVisualization:
         """Test graph visualization functionality"""
 
@@ -806,6 +1053,41 @@ class TestKnowledgeGraph:
             
             assert stats["last_refresh"] == "2023-01-01T12:00:00"
 
+        def test_get_graph_stats_cached_until_graph_changes(self, knowledge_graph):
+            """Test statistics are reused until an entity is written"""
+            knowledge_graph.graph.add_edge("A", "B")
+            with patch.object(
+                knowledge_graph, "_compute_graph_stats", wraps=knowledge_graph._compute_graph_stats
+            ) as compute:
+                stats = knowledge_graph.get_graph_stats()
+
+                assert knowledge_graph.get_graph_stats() == stats
+                assert compute.call_count == 1
+                assert stats["avg_degree"] == 1.0
+
+                knowledge_graph.add_entity_node({"id": "A", "name": "Alpha", "entity_type": "tool"})
+                updated = knowledge_graph.get_graph_stats()
+
+                assert compute.call_count == 2
+                assert updated["entity_type_distribution"] == {"tool": 1, "unknown": 1}
+
+                # Direct edits to .graph change the counts in the cache key
+                knowledge_graph.graph.add_edge("B", "C")
+                assert knowledge_graph.get_graph_stats()["num_edges"] == 2
+                assert compute.call_count == 3
+
+        def test_get_graph_stats_returns_copies(self, knowledge_graph):
+            """Test modifying returned statistics does not change the cache"""
+            knowledge_graph.graph.add_edge("A", "B")
+            stats = knowledge_graph.get_graph_stats()
+            stats["num_nodes"] = 99
+            stats["entity_type_distribution"]["unknown"] = 99
+
+            fresh = knowledge_graph.get_graph_stats()
+
+            assert fresh["num_nodes"] == 2
+            assert fresh["entity_type_distribution"] == {"unknown": 2}
+
     class TestEdgeCases:
         """Test edge cases and error conditions"""
 
@@ -8,14 +8,16 @@ Target: Maintain >90% coverage while adding edge case coverage.
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timedelta
+from uuid import UUID
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 from context_persistence.models_enhanced import (
     Base, Conversation, Message, Decision, Entity, Relationship, 
-    EntityMention, TopicCluster, SearchIndex,
+    EntityMention, TopicCluster, SearchIndex, TopicClusterEntity,
     get_valid_entities_at_time, get_entity_history, invalidate_entity,
-    get_relationship_paths
+    get_relationship_paths, create_fts_tables, create_stats_triggers, migrate_link_tables,
+    Stats, new_ids
 )
 
 
@@ -38,6 +40,15 @@ class TestBaseModel:
         
         assert expected_tables.issubset(set(model_names))
 
+    def test_new_ids_are_ordered_uuid7(self):
+        """Test generated ids are unique, ascending version 7 UUIDs"""
+        ids = new_ids(100)
+
+        assert len(set(ids)) == 100
+        assert ids == sorted(ids)
+        assert all(UUID(i).version == 7 for i in ids)
+        assert new_ids(1)[0][:8] >= ids[-1][:8]
+
 
 class TestConversation:
     """Test Conversation model"""
@@ -582,6 +593,69 @@ class TestTopicCluster:
             )
             assert cluster.size == size
 
+    def test_topic_cluster_members_use_link_tables(self):
+        """Test cluster members persist as indexed link rows"""
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            session.add(TopicCluster(id="api", name="API", entity_ids=["e1", "e2"], conversation_ids=["c1"]))
+            session.add(TopicCluster(id="db", name="DB", entity_ids=["e2"]))
+            session.commit()
+
+            # Membership lookups are plain joins instead of JSON scans
+            clusters = session.scalars(
+                sa.select(TopicCluster.id)
+                .join(TopicClusterEntity)
+                .where(TopicClusterEntity.entity_id == "e2")
+                .order_by(TopicCluster.id)
+            ).all()
+            assert clusters == ["api", "db"]
+
+            cluster = session.get(TopicCluster, "api")
+            cluster.entity_ids.remove("e1")
+            session.commit()
+            assert session.scalar(sa.select(sa.func.count()).select_from(TopicClusterEntity)) == 2
+            assert list(cluster.conversation_ids) == ["c1"]
+
+    def test_migrate_link_tables_from_json_columns(self):
+        """Test upgrading a database that stored memberships as JSON lists"""
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            # Columns as they existed before the link tables
+            conn.exec_driver_sql("ALTER TABLE topic_clusters ADD COLUMN entity_ids JSON")
+            conn.exec_driver_sql("ALTER TABLE topic_clusters ADD COLUMN conversation_ids JSON")
+            conn.exec_driver_sql("ALTER TABLE search_index ADD COLUMN connected_entity_ids JSON")
+            conn.exec_driver_sql("INSERT INTO conversations (id, started_at) VALUES ('c1', '2023-01-01')")
+            for entity_id in ("e1", "e2"):
+                conn.exec_driver_sql(
+                    "INSERT INTO entities (id, name, entity_type, event_time, ingestion_time, valid_from) "
+                    f"VALUES ('{entity_id}', '{entity_id}', 'tool', '2023-01-01', '2023-01-01', '2023-01-01')"
+                )
+            conn.exec_driver_sql(
+                "INSERT INTO topic_clusters (id, name, created_at, entity_ids, conversation_ids) "
+                """VALUES ('api', 'API', '2023-01-01', '["e1", "e2", "gone"]', '["c1"]')"""
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO topic_clusters (id, name, created_at, entity_ids) "
+                "VALUES ('empty', 'Empty', '2023-01-01', NULL)"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO search_index (item_type, item_id, content, timestamp, connected_entity_ids) "
+                """VALUES ('message', '1', 'text', '2023-01-01', '["e2"]')"""
+            )
+
+            migrate_link_tables(conn)
+            # Cleared columns make a second run a no-op
+            migrate_link_tables(conn)
+
+        with Session(engine) as session:
+            assert sorted(session.get(TopicCluster, "api").entity_ids) == ["e1", "e2"]
+            assert list(session.get(TopicCluster, "api").conversation_ids) == ["c1"]
+            assert list(session.get(TopicCluster, "empty").entity_ids) == []
+            assert list(session.scalars(sa.select(SearchIndex)).one().connected_entity_ids) == ["e2"]
+
 
 class TestSearchIndex:
     """Test SearchIndex model"""
@@ -649,6 +723,33 @@ class TestSearchIndex:
         
         assert index.content == long_content
 
+    def test_search_index_fts_ranks_content_and_keywords(self):
+        """Test the FTS5 index tracks search_index rows for BM25 lookups"""
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            create_fts_tables(conn)
+
+        with Session(engine) as session:
+            session.add_all([
+                SearchIndex(item_type="message", item_id="1", content="Caching the API layer", keywords=[]),
+                SearchIndex(item_type="entity", item_id="e1", content="Redis", keywords=["cache", "store"]),
+                SearchIndex(item_type="message", item_id="2", content="Unrelated text", keywords=[]),
+            ])
+            session.commit()
+
+            query = sa.text(
+                "SELECT s.item_id FROM search_index_fts "
+                "JOIN search_index s ON s.id = search_index_fts.rowid "
+                "WHERE search_index_fts MATCH :match ORDER BY bm25(search_index_fts)"
+            )
+            # Porter stemming matches "caching" and "cache"
+            assert sorted(session.scalars(query, {"match": "cache"})) == ["1", "e1"]
+
+            session.delete(session.scalars(sa.select(SearchIndex).where(SearchIndex.item_id == "e1")).one())
+            session.commit()
+            assert list(session.scalars(query, {"match": "store"})) == []
+
 
 class TestBiTemporalQueries:
     """Test bi-temporal query helper functions"""
@@ -743,13 +844,37 @@ class TestBiTemporalQueries:
             assert mock_entity.valid_until == mock_now
 
     def test_get_relationship_paths(self):
-        """Test getting relationship paths (placeholder implementation)"""
-        mock_session = Mock(spec=Session)
-        
-        result = get_relationship_paths(mock_session, "source", "target", 3)
-        
-        # Current implementation returns None (placeholder)
-        assert result is None
+        """Test relationship paths are found with a recursive CTE"""
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        now = datetime.utcnow()
+
+        with Session(engine) as session:
+            for entity_id in ("a", "b", "c", "d"):
+                session.add(Entity(
+                    id=entity_id, name=entity_id, entity_type="concept",
+                    event_time=now, valid_from=now
+                ))
+            for rel_id, source, target in [
+                ("ab", "a", "b"), ("bc", "b", "c"), ("ac", "a", "c"),
+                ("ca", "c", "a"), ("cd", "c", "d")
+            ]:
+                session.add(Relationship(
+                    id=rel_id, source_entity_id=source, target_entity_id=target,
+                    relationship_type="relates_to", event_time=now, valid_from=now
+                ))
+            session.add(Relationship(
+                id="ad_old", source_entity_id="a", target_entity_id="d",
+                relationship_type="relates_to", event_time=now, valid_from=now,
+                valid_until=now
+            ))
+            session.commit()
+
+            assert get_relationship_paths(session, "a", "c", 3) == [["ac"], ["ab", "bc"]]
+            assert get_relationship_paths(session, "a", "c", 1) == [["ac"]]
+            # Ended relationships and cycles back through the source are skipped
+            assert get_relationship_paths(session, "a", "d", 3) == [["ac", "cd"], ["ab", "bc", "cd"]]
+            assert get_relationship_paths(session, "d", "a", 3) == []
 
 
 class TestEdgeCases:
@@ -1029,6 +1154,31 @@ class TestDataIntegrity:
         # Should allow creation (consistency checks at application level)
         assert mention.entity_id == "different_entity"
 
+    def test_stats_triggers_track_totals(self):
+        """Test trigger-maintained totals follow inserts, updates and deletes"""
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            # Rows that predate the triggers are counted when the row is seeded
+            session.add(Conversation(id="conv1"))
+            session.add(Message(conversation_id="conv1", content="a", tokens=3))
+            session.commit()
+            create_stats_triggers(session.connection())
+
+            session.add(Message(conversation_id="conv1", content="b", tokens=4))
+            session.add(Message(conversation_id="conv1", content="c"))
+            session.commit()
+
+            message = session.scalars(sa.select(Message).where(Message.content == "a")).one()
+            message.tokens = 10
+            session.commit()
+            session.delete(session.scalars(sa.select(Message).where(Message.content == "b")).one())
+            session.commit()
+
+            stats = session.get(Stats, 1)
+            assert (stats.conversations, stats.messages, stats.total_tokens) == (1, 2, 10)
+
 
 class TestPerformanceConsiderations:
     """Test performance-related scenarios"""